@@ -0,0 +1,394 @@
+"""
+单帧热路径的微基准测试
+
+覆盖:
+- payload_init: RawPayload 构造(含 _init_private_field), 按分辨率、objects 数量、是否开启共享内存、是否使用槽位池
+- payload_attach: 接收端由 raw_shared_memory_id 构造 RawPayload
+- payload_set_raw: 开启共享内存时 set_raw 设置已在共享内存中的 raw, 即共享内存数据的一致性校验
+- payload_fill: 输入节点开启共享内存时填入 raw, 复制到共享内存 / 由 alloc_raw 直接分配(不含写入数据的耗时)
+- payload_dump: RawPayload.model_dump, 按 objects 数量、是否开启共享内存
+- codec: 按传输格式编码为发送的消息文本 / 由消息文本解码, 按 objects 数量, raw 随消息发送时按压缩编码
+- raw_decode: 压缩的 raw 在首次访问时的解码
+- smim_add_remove / smim_attach: SharedMemoryIDManager 创建+释放 / attach
+- smim_remove_expired: 定时过期清理, 按记录的共享内存数量
+- short_uid: generate_short_uid
+- metrics: CoralNodeMetrics.system_set, 关闭 / 开启(未连接 broker, 只测量消息构造与 paho 入队)
+
+结果为多轮中最快一轮的每次操作耗时(微秒)。基线与机器相关, 应在同一台机器上生成和比对。
+
+用法:
+    python benchmarks/micro.py                       # 运行并与基线比对, 超出容差时退出码为1
+    python benchmarks/micro.py --save-baseline       # 运行并更新基线
+    python benchmarks/micro.py --filter payload --tolerance 0.3
+"""
+
+import gc
+import os
+import sys
+import time
+import json
+import argparse
+from typing import Callable, Dict, List
+
+import numpy as np
+import paho.mqtt.client as mqtt
+from loguru import logger
+from wrapyfi.encoders import JsonEncoder, JsonDecodeHook
+
+# 将src加入到系统路径
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from coral import RawPayload, ObjectPayload  # noqa: E402
+from coral.utils import generate_short_uid  # noqa: E402
+from coral.codec import encode_payload, decode_payload  # noqa: E402
+from coral.wire import pack_message, unpack_message  # noqa: E402
+from coral.metrics import CoralNodeMetrics  # noqa: E402
+from coral.constants import SHARED_DATA_TYPE  # noqa: E402
+from coral.sched import SharedMemoryIDManager as SMIM  # noqa: E402
+
+BASELINE_FP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "micro_baseline.json")
+
+FRAME_SIZES = {"480p": (480, 640), "720p": (720, 1280), "1080p": (1080, 1920)}
+OBJECT_COUNTS = [0, 10, 100]
+SHM_POOL_SIZE = 4
+# 过期清理用例中记录的共享内存数量
+STORE_SIZES = [100, 10000]
+
+
+def measure(
+    op: Callable,
+    setup: Callable = None,
+    teardown: Callable = None,
+    number: int = 200,
+    repeat: int = 7,
+) -> float:
+    """
+    Time an operation, excluding its setup and teardown.
+
+    Args:
+        op (Callable): The operation, called with the value returned by setup.
+        setup (Callable, optional): Called before every operation.
+        teardown (Callable, optional): Called after every operation with the value returned by op.
+        number (int): Operations per repeat.
+        repeat (int): Number of repeats, the fastest repeat is reported.
+
+    Returns:
+        float: Microseconds per operation.
+    """
+    results = []
+    # 第一轮为预热, 不计入结果
+    for _ in range(repeat + 1):
+        # 与 timeit 一致, 计时期间关闭gc
+        gc.collect()
+        gc.disable()
+        total = 0.0
+        for _ in range(number):
+            state = setup() if setup else None
+            start = time.perf_counter()
+            value = op(state)
+            total += time.perf_counter() - start
+            if teardown:
+                teardown(value)
+        gc.enable()
+        results.append(total / number * 1e6)
+    # 取最快的一轮, 其余轮次的差异主要来自调度与其他进程的干扰
+    return min(results[1:])
+
+
+def make_objects(count: int) -> list:
+    return [
+        ObjectPayload(
+            class_id=1,
+            label="person",
+            prob=0.9,
+            box={"x1": 0, "y1": 0, "x2": 10, "y2": 10},
+        )
+        for _ in range(count)
+    ]
+
+
+def release(payload: RawPayload):
+    payload.release_shared_memory()
+
+
+def payload_cases(number: int) -> Dict[str, float]:
+    results = {}
+    for name, (height, width) in FRAME_SIZES.items():
+        raw = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+        for shm in (False, True):
+            results[f"payload_init.{name}.shm_{int(shm)}"] = measure(
+                lambda _: RawPayload(
+                    source_id="bench", raw=raw, enable_shared_memory=shm
+                ),
+                teardown=release,
+                number=number,
+            )
+        # 槽位池只在单例创建时配置, 此处临时开启
+        SMIM()._pool_size = SHM_POOL_SIZE
+        results[f"payload_init.{name}.shm_pool"] = measure(
+            lambda _: RawPayload(source_id="bench", raw=raw, enable_shared_memory=True),
+            teardown=release,
+            number=number,
+        )
+        SMIM()._pool_size = 0
+        # 接收端: 共享内存由上游创建, 只 attach
+        upstream = RawPayload(source_id="bench", raw=raw, enable_shared_memory=True)
+        results[f"payload_attach.{name}"] = measure(
+            lambda _: RawPayload(
+                source_id="bench",
+                raw_shared_memory_id=upstream.raw_shared_memory_id,
+                enable_shared_memory=True,
+            ),
+            number=number,
+        )
+        # 重新设置共享内存中的同一 raw, 只校验不复制
+        results[f"payload_set_raw.{name}"] = measure(
+            lambda _: upstream.set_raw(upstream.raw), number=number
+        )
+        upstream.release_shared_memory()
+        # 输入节点: 返回的 raw 复制到共享内存 / 由 alloc_raw 直接分配在共享内存中
+        new_payload = lambda: RawPayload(source_id="bench", enable_shared_memory=True)
+        results[f"payload_fill.{name}.copy"] = measure(
+            lambda payload: payload.set_raw(raw) or payload,
+            setup=new_payload,
+            teardown=release,
+            number=number,
+        )
+        results[f"payload_fill.{name}.alloc_raw"] = measure(
+            lambda payload: payload.set_raw(payload.alloc_raw(raw.shape, raw.dtype))
+            or payload,
+            setup=new_payload,
+            teardown=release,
+            number=number,
+        )
+
+    raw = np.random.randint(0, 255, (*FRAME_SIZES["720p"], 3), dtype=np.uint8)
+    for count in OBJECT_COUNTS:
+        objects = [item.model_dump() for item in make_objects(count)]
+        results[f"payload_init.objects_{count}"] = measure(
+            lambda _: RawPayload(
+                source_id="bench", raw=raw, objects=objects, enable_shared_memory=False
+            ),
+            number=number,
+        )
+        for shm in (False, True):
+            payload = RawPayload(
+                source_id="bench",
+                raw=raw,
+                objects=make_objects(count),
+                enable_shared_memory=shm,
+            )
+            results[f"payload_dump.objects_{count}.shm_{int(shm)}"] = measure(
+                lambda _: payload.model_dump(), number=number
+            )
+            payload.release_shared_memory()
+    return results
+
+
+def smim_cases(number: int) -> Dict[str, float]:
+    results = {}
+    for name, (height, width) in FRAME_SIZES.items():
+        shape = (height, width, 3)
+
+        def add_remove(memory_id: str):
+            SMIM().add(memory_id, shape, np.uint8)
+            SMIM().remove(memory_id)
+
+        results[f"smim_add_remove.{name}"] = measure(
+            add_remove,
+            setup=lambda: f"{SHARED_DATA_TYPE}{generate_short_uid()}",
+            number=number,
+        )
+        memory_id = f"{SHARED_DATA_TYPE}{generate_short_uid()}"
+        SMIM().add(memory_id, shape, np.uint8)
+        results[f"smim_attach.{name}"] = measure(
+            lambda _: SMIM().attach(memory_id), number=number
+        )
+        SMIM().remove(memory_id)
+    # 定时过期清理, 记录中均为未过期的共享内存
+    for size in STORE_SIZES:
+        now = time.time()
+        SMIM().takeover(
+            {f"{SHARED_DATA_TYPE}bench-{idx}": now for idx in range(size)}
+        )
+        results[f"smim_remove_expired.store_{size}"] = measure(
+            lambda _: SMIM().remove_expired(), number=number
+        )
+        SMIM().handover()
+        SMIM().dump()
+    return results
+
+
+def encode_message(payload: RawPayload, payload_format: str, raw_codec: str = None) -> list:
+    """与发送者一致, 编码为 topic 之后的消息段"""
+    data = encode_payload(payload, payload_format, raw_codec)
+    if payload_format == "binary":
+        return pack_message(data)
+    return [json.dumps(data, cls=JsonEncoder).encode()]
+
+
+def codec_cases(number: int) -> Dict[str, float]:
+    """包含 json 编码与解码, 与 zeromq 的发布者和接收者一致"""
+    results = {}
+    object_hook = JsonDecodeHook().object_hook
+
+    def run(
+        name: str,
+        payload: RawPayload,
+        payload_format: str,
+        number: int,
+        raw_codec: str = None,
+    ):
+        case = f"{payload_format}_{raw_codec}" if raw_codec else payload_format
+        results[f"codec_encode.{name}.{case}"] = measure(
+            lambda _: encode_message(payload, payload_format, raw_codec), number=number
+        )
+        frames = [
+            bytes(frame)
+            for frame in encode_message(payload, payload_format, raw_codec)
+        ]
+        # 压缩的 raw 不在此处解码, 见 raw_decode
+        results[f"codec_decode.{name}.{case}"] = measure(
+            lambda _: decode_payload(
+                RawPayload,
+                unpack_message(frames, object_hook=object_hook),
+                payload._enable_shared_memory,
+            ),
+            number=number,
+        )
+
+    raw = np.random.randint(0, 255, (*FRAME_SIZES["720p"], 3), dtype=np.uint8)
+    for count in OBJECT_COUNTS:
+        payload = RawPayload(
+            source_id="bench",
+            raw=raw,
+            objects=make_objects(count),
+            enable_shared_memory=True,
+        )
+        for payload_format in ("native", "trusted", "binary"):
+            run(f"objects_{count}", payload, payload_format, number)
+        payload.release_shared_memory()
+    # 不开启共享内存时 raw 随消息发送, native 格式较慢, 减少次数
+    payload = RawPayload(source_id="bench", raw=raw, enable_shared_memory=False)
+    for payload_format in ("native", "binary"):
+        run("raw_720p", payload, payload_format, max(number // 20, 1))
+    for raw_codec in ("jpeg", "png", "webp"):
+        run("raw_720p", payload, "binary", max(number // 20, 1), raw_codec)
+        encoded = encode_payload(payload, "binary", raw_codec)
+        results[f"raw_decode.720p.{raw_codec}"] = measure(
+            lambda received: received.raw,
+            setup=lambda: decode_payload(RawPayload, encoded, False),
+            number=max(number // 20, 1),
+        )
+    return results
+
+
+def misc_cases(number: int) -> Dict[str, float]:
+    disabled = CoralNodeMetrics(False, "bench", "bench_node")
+    # 不读取公共配置与连接 broker, 只测量消息构造与 paho 的入队开销
+    enabled = CoralNodeMetrics.__new__(CoralNodeMetrics)
+    enabled.enable = True
+    enabled.topic_prefix = "organization/bench/gateway/bench/pipeline/bench/node/bench"
+    enabled.mqtt_client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    return {
+        "short_uid": measure(lambda _: generate_short_uid(), number=number * 10),
+        "metrics.disabled": measure(
+            lambda _: disabled.system_set("process_frames_count", 1),
+            number=number * 10,
+        ),
+        "metrics.enabled": measure(
+            lambda _: enabled.system_set("process_frames_count", 1), number=number
+        ),
+    }
+
+
+def slower_cases(
+    results: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> List[str]:
+    return [
+        name
+        for name, value in results.items()
+        if baseline.get(name) and value / baseline[name] > 1 + tolerance
+    ]
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float):
+    """打印与基线的对比, 返回超出容差的用例"""
+    regressions = slower_cases(results, baseline, tolerance)
+    print(f"{'case':<40}{'us':>12}{'baseline':>12}{'ratio':>8}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        ratio = value / base if base else None
+        flag = "  REGRESSION" if name in regressions else ""
+        print(
+            f"{name:<40}{value:>12.2f}"
+            f"{base if base is not None else '-':>12}"
+            f"{f'{ratio:.2f}' if ratio is not None else '-':>8}{flag}"
+        )
+    return regressions
+
+
+def run_cases(number: int, name_filter: str = None) -> Dict[str, float]:
+    results = {}
+    for cases in (payload_cases, codec_cases, smim_cases, misc_cases):
+        results.update(cases(number))
+    return {
+        name: round(value, 3)
+        for name, value in results.items()
+        if not name_filter or name_filter in name
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="per-frame hot path microbenchmarks")
+    parser.add_argument("--number", type=int, default=200, help="每轮的操作次数")
+    parser.add_argument("--filter", default=None, help="只运行名称包含该字符串的用例")
+    parser.add_argument("--baseline", default=BASELINE_FP)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--log-level", default="INFO", help="日志级别, DEBUG 时会计入共享内存日志的输出耗时"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="相对基线允许的变慢比例"
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=3,
+        help="完整运行的最多次数, 每个用例取最快的一次; 比对时没有变慢的用例即停止",
+    )
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+    SMIM(manager_id="coral_bench_micro", expire=60)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = run_cases(args.number, args.filter)
+    for _ in range(args.rounds - 1):
+        # 偶发的调度干扰只会让结果变慢, 重新运行以排除
+        if not args.save_baseline and not slower_cases(
+            results, baseline, args.tolerance
+        ):
+            break
+        again = run_cases(args.number, args.filter)
+        results = {name: min(value, again[name]) for name, value in results.items()}
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=4)
+        print(json.dumps(results, indent=4))
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by > {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
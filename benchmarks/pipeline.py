@@ -0,0 +1,311 @@
+"""
+端到端流水线基准测试: input -> interface -> output
+
+三个节点分别运行在独立进程中, 通过本机 zmq 通信, 输入节点按固定帧率产生合成图片,
+推理节点返回指定数量的 objects, 输出节点统计端到端延迟。
+
+统计:
+- throughput_fps: 输出节点的接收帧率
+- latency_ms: 从输入节点产生数据帧到输出节点接收的 p50/p95/p99/max
+- cpu_percent: 各节点进程在运行期间的CPU占用(100为一个核)
+- frames: 各节点的帧数, dropped 为输入节点发送但输出节点未收到的帧数
+
+用法: python benchmarks/pipeline.py --width 1920 --height 1080 --fps 30 --workers 3 --duration 10 --output result.json
+"""
+
+import os
+import sys
+import time
+import json
+import signal
+import tempfile
+import argparse
+import subprocess
+import multiprocessing
+
+import numpy as np
+
+# 将src加入到系统路径
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from coral import (  # noqa: E402
+    CoralNode,
+    NodeType,
+    RTManager,
+    FirstPayload,
+    ObjectPayload,
+    ObjectsPayload,
+    InterfaceMode,
+)
+
+ROLES = ["input", "interface", "output"]
+NODE_IDS = {role: f"bench_{role}" for role in ROLES}
+
+
+def count_frame(node: CoralNode):
+    """帧数计数器在进程间共享, run_mode 为 process 时 fork 出的工作进程同样计入"""
+    with node.bench_frames.get_lock():
+        node.bench_frames.value += 1
+
+
+class BenchInputNode(CoralNode):
+    node_name = "基准测试输入节点"
+    node_desc = "按固定帧率产生合成图片"
+    node_type = NodeType.input
+
+    def init(self, context: dict):
+        args = context["args"] = self.bench_args
+        context["raw"] = np.random.randint(
+            0, 255, (args.height, args.width, 3), dtype=np.uint8
+        )
+        context["next_time"] = time.time()
+
+    def sender(self, payload, context: dict):
+        context["next_time"] += 1 / context["args"].fps
+        delay = context["next_time"] - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        # 从数据帧真正产生时开始计时
+        payload.timestamp = time.time()
+        count_frame(self)
+        raw = context["raw"]
+        if context["args"].alloc_raw:
+            # 模拟直接在共享内存中解码/绘制
+            buffer = payload.alloc_raw(raw.shape, raw.dtype)
+            buffer[:] = raw
+            return FirstPayload(raw=buffer)
+        return FirstPayload(raw=raw)
+
+
+class BenchInterfaceNode(CoralNode):
+    node_name = "基准测试推理节点"
+    node_desc = "返回指定数量的 objects"
+    node_type = NodeType.interface
+
+    def init(self, context: dict):
+        context["args"] = self.bench_args
+
+    def sender(self, payload, context: dict):
+        args = context["args"]
+        if args.work_ms > 0:
+            time.sleep(args.work_ms / 1000)
+        count_frame(self)
+        objects = [
+            ObjectPayload(
+                class_id=1,
+                label="person",
+                prob=0.9,
+                box={"x1": 0, "y1": 0, "x2": 10, "y2": 10},
+            )
+            for _ in range(args.objects)
+        ]
+        return ObjectsPayload(objects=objects, mode=InterfaceMode.OVERWRITE)
+
+
+class BenchOutputNode(CoralNode):
+    node_name = "基准测试输出节点"
+    node_desc = "统计端到端延迟"
+    node_type = NodeType.output
+
+    def init(self, context: dict):
+        pass
+
+    def sender(self, payload, context: dict):
+        crt_time = time.time()
+        count_frame(self)
+        # 各节点耗时之和 + 从上一个节点发送到当前节点接收的耗时
+        self.bench_latencies.append(
+            (crt_time, payload.nodes_cost + crt_time - payload.timestamp)
+        )
+
+
+NODE_CLASSES = {
+    "input": BenchInputNode,
+    "interface": BenchInterfaceNode,
+    "output": BenchOutputNode,
+}
+
+
+def node_config(role: str, args) -> dict:
+    config = {
+        "node_id": NODE_IDS[role],
+        "process": {
+            "enable_parallel": role == "interface" and args.workers > 1,
+            "count": args.workers,
+            "run_mode": args.run_mode,
+        },
+        "generic": {
+            "enable_shared_memory": args.shared_memory,
+            "shared_memory_pool_size": args.shm_pool_size,
+            "enable_metrics": False,
+        },
+        "meta": {},
+    }
+    if role != "input":
+        upstream = ROLES[ROLES.index(role) - 1]
+        config["meta"]["receivers"] = [{"node_id": NODE_IDS[upstream]}]
+    if role != "output":
+        config["meta"]["sender"] = {
+            "node_id": NODE_IDS[role],
+            "raw_type": "RawImage",
+            "payload_format": args.payload_format,
+        }
+        if args.raw_codec:
+            config["meta"]["sender"]["raw_codec"] = args.raw_codec
+    return config
+
+
+def run_node(args):
+    """子进程: 运行单个节点, 收到 SIGTERM 后写出统计结果"""
+    # 每个进程只能注册一个返参类
+    if args.role == "input":
+        RTManager.register()(FirstPayload)
+    elif args.role == "interface":
+        RTManager.register()(ObjectsPayload)
+    config_path = os.path.join(args.workdir, f"{args.role}.json")
+    node = NODE_CLASSES[args.role](config_path=config_path)
+    node.bench_args = args
+    node.bench_frames = multiprocessing.Value("q", 0)
+    node.bench_latencies = []
+    signal.signal(signal.SIGTERM, lambda *_: node.shutdown())
+    start_cpu, start_time = time.process_time(), time.time()
+    node.run()
+    stats = {
+        "frames": node.bench_frames.value,
+        "cpu_percent": round(
+            (time.process_time() - start_cpu) / (time.time() - start_time) * 100, 2
+        ),
+        "latencies": node.bench_latencies,
+    }
+    with open(os.path.join(args.workdir, f"{args.role}.stats.json"), "w") as f:
+        json.dump(stats, f)
+    # wrapyfi 的后台线程不会退出, os._exit 不执行 atexit, 需手动删除带引用计数的共享内存
+    node.shared_memory_mamager.destroy_slots()
+    os._exit(0)
+
+
+def percentile_ms(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 3)
+
+
+def summarize(args, stats: dict) -> dict:
+    latencies = stats["output"]["latencies"]
+    # 丢弃预热阶段的数据帧
+    if latencies:
+        begin = latencies[0][0] + args.warmup
+        latencies = [item for item in latencies if item[0] >= begin] or latencies
+    recv_times = [item[0] for item in latencies]
+    values = [item[1] for item in latencies]
+    duration = recv_times[-1] - recv_times[0] if len(recv_times) > 1 else 0
+    return {
+        "config": {
+            "width": args.width,
+            "height": args.height,
+            "fps": args.fps,
+            "workers": args.workers,
+            "run_mode": args.run_mode,
+            "shared_memory": args.shared_memory,
+            "shm_pool_size": args.shm_pool_size,
+            "payload_format": args.payload_format,
+            "raw_codec": args.raw_codec,
+            "alloc_raw": args.alloc_raw,
+            "objects": args.objects,
+            "work_ms": args.work_ms,
+            "duration": args.duration,
+        },
+        "throughput_fps": round((len(values) - 1) / duration, 2) if duration else 0,
+        "latency_ms": {
+            "p50": percentile_ms(values, 50),
+            "p95": percentile_ms(values, 95),
+            "p99": percentile_ms(values, 99),
+            "max": percentile_ms(values, 100),
+        }
+        if values
+        else None,
+        "cpu_percent": {role: stats[role]["cpu_percent"] for role in ROLES},
+        "frames": {
+            "sent": stats["input"]["frames"],
+            "processed": stats["interface"]["frames"],
+            "received": stats["output"]["frames"],
+            "dropped": stats["input"]["frames"] - stats["output"]["frames"],
+        },
+    }
+
+
+def run_pipeline(args) -> dict:
+    """主进程: 启动三个节点, 运行指定时长后依次停止并汇总结果"""
+    with tempfile.TemporaryDirectory(prefix="coral_bench_") as workdir:
+        for role in ROLES:
+            with open(os.path.join(workdir, f"{role}.json"), "w") as f:
+                json.dump(node_config(role, args), f)
+        argv = [sys.executable, os.path.abspath(__file__)] + sys.argv[1:]
+        processes = {}
+        # 先启动下游节点, 等待订阅建立后再产生数据
+        for role in reversed(ROLES):
+            processes[role] = subprocess.Popen(
+                argv + ["--role", role, "--workdir", workdir],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            time.sleep(args.startup)
+        time.sleep(args.duration)
+        # 从上游开始停止, 留出时间让在途的数据帧到达输出节点
+        for role in ROLES:
+            processes[role].send_signal(signal.SIGTERM)
+            processes[role].wait(timeout=30)
+            time.sleep(args.drain)
+        stats = {}
+        for role in ROLES:
+            with open(os.path.join(workdir, f"{role}.stats.json")) as f:
+                stats[role] = json.load(f)
+    return summarize(args, stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="end-to-end pipeline benchmark")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--run-mode", default="threads")
+    # argparse.BooleanOptionalAction 需要 Python 3.9+
+    parser.add_argument(
+        "--shared-memory", dest="shared_memory", action="store_true", default=True
+    )
+    parser.add_argument(
+        "--no-shared-memory", dest="shared_memory", action="store_false"
+    )
+    parser.add_argument(
+        "--shm-pool-size", type=int, default=0, help="共享内存槽位池每种 shape 的槽位数"
+    )
+    parser.add_argument("--payload-format", default="native")
+    parser.add_argument(
+        "--raw-codec", default=None, help="未开启共享内存时 raw 的压缩编码, jpeg | png | webp"
+    )
+    parser.add_argument(
+        "--alloc-raw",
+        action="store_true",
+        help="输入节点通过 payload.alloc_raw 在共享内存中直接写入 raw",
+    )
+    parser.add_argument("--objects", type=int, default=10)
+    parser.add_argument("--work-ms", type=float, default=0)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=1)
+    parser.add_argument("--startup", type=float, default=2)
+    parser.add_argument("--drain", type=float, default=1)
+    parser.add_argument("--output", default=None, help="结果写入的json文件")
+    parser.add_argument("--role", choices=ROLES, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role:
+        return run_node(args)
+    result = run_pipeline(args)
+    print(json.dumps(result, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+并行模式下 receiver -> worker 的队列交接延迟基准测试
+
+对比:
+- deque: 旧实现, worker 通过 popleft + time.sleep(0.01) 轮询
+- payload_queue: PayloadQueue, worker 阻塞等待并在入队时被唤醒
+
+用法: python benchmarks/queue_handoff.py --frames 500 --fps 100 --workers 3
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+from threading import Thread
+from collections import deque
+
+import numpy as np
+
+# 将src加入到系统路径
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from coral.queues import PayloadQueue  # noqa: E402
+
+
+class DequeQueue:
+    """旧实现: deque + sleep 轮询"""
+
+    def __init__(self, maxsize: int):
+        self._items = deque(maxlen=maxsize)
+
+    def put(self, item):
+        self._items.append(item)
+
+    def get(self, timeout: float = None):
+        while True:
+            try:
+                return self._items.popleft()
+            except IndexError:
+                time.sleep(0.01)
+
+
+def run(queue, frames: int, fps: float, workers: int):
+    latencies = []
+    stop = object()
+
+    def consumer():
+        while True:
+            item = queue.get()
+            if item is stop:
+                break
+            latencies.append(time.perf_counter() - item)
+
+    threads = [Thread(target=consumer) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    interval = 1 / fps
+    for _ in range(frames):
+        queue.put(time.perf_counter())
+        time.sleep(interval)
+    for _ in threads:
+        queue.put(stop)
+    for t in threads:
+        t.join()
+
+    values = np.array(latencies) * 1000
+    return {
+        "frames": len(values),
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+        "max_ms": round(float(values.max()), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="queue handoff latency benchmark")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--fps", type=float, default=100)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--max-qsize", type=int, default=180)
+    args = parser.parse_args()
+
+    result = {
+        "deque": run(DequeQueue(args.max_qsize), args.frames, args.fps, args.workers),
+        "payload_queue": run(
+            PayloadQueue(args.max_qsize), args.frames, args.fps, args.workers
+        ),
+    }
+    print(json.dumps(result, indent=4))
+
+
+if __name__ == "__main__":
+    main()
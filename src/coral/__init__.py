@@ -1,4 +1,6 @@
 from .coral import CoralNode, NodeType
+from .aio import AsyncCoralNode
+from .pipeline import CoralPipeline
 from .types import (
     BaseParamsModel,
     ReturnPayloadWithTS,
@@ -16,6 +18,8 @@ from .types import (
 
 __all__ = [
     "CoralNode",
+    "AsyncCoralNode",
+    "CoralPipeline",
     "NodeType",
     "BaseParamsModel",
     "ReturnPayloadWithTS",
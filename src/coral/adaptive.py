@@ -0,0 +1,95 @@
+import time
+from threading import Lock
+from collections import defaultdict
+
+
+class AdaptiveSkipController:
+    """
+    依据实测耗时动态调整跳帧比例的控制器
+
+    - 目标延迟: 节点耗时(上游发送 -> 排队等待 -> 处理完成)的滑动平均趋近 target_latency
+    - CPU预算: 单帧处理耗时 * 处理帧率 趋近 cpu_budget(核数)
+    - 跳帧比例按偏差比例调整, 各数据源按比例均匀跳帧
+    """
+
+    def __init__(
+        self,
+        target_latency: float = 0,
+        cpu_budget: float = 0,
+        gain: float = 0.05,
+        smoothing: float = 0.2,
+        max_skip_ratio: float = 0.95,
+    ):
+        # 单位: 秒, 0为不限制
+        self._target_latency = target_latency
+        # 单位: 核数, 0为不限制
+        self._cpu_budget = cpu_budget
+        self._gain = gain
+        self._smoothing = smoothing
+        self._max_skip_ratio = max_skip_ratio
+        self._lock = Lock()
+        self._skip_ratio = 0.0
+        self._node_cost = None
+        self._process_cost = None
+        self._interval = None
+        self._last_observe_time = None
+        # 每个数据源累计的可处理额度, 额度满1处理一帧
+        self._credits = defaultdict(float)
+
+    @property
+    def skip_ratio(self) -> float:
+        return self._skip_ratio
+
+    def _ewma(self, avg: float, value: float) -> float:
+        if avg is None:
+            return value
+        return avg + self._smoothing * (value - avg)
+
+    def observe(self, process_cost: float, node_cost: float):
+        """
+        Feed the costs of a processed frame and adjust the skip ratio.
+
+        Args:
+            process_cost (float): Seconds spent in the sender.
+            node_cost (float): Seconds from the upstream send to the end of processing.
+        """
+        with self._lock:
+            now = time.time()
+            if self._last_observe_time is not None:
+                self._interval = self._ewma(
+                    self._interval, now - self._last_observe_time
+                )
+            self._last_observe_time = now
+            self._process_cost = self._ewma(self._process_cost, process_cost)
+            self._node_cost = self._ewma(self._node_cost, node_cost)
+
+            errors = []
+            if self._target_latency > 0:
+                errors.append(self._node_cost / self._target_latency - 1)
+            if self._cpu_budget > 0 and self._interval:
+                usage = self._process_cost / self._interval
+                errors.append(usage / self._cpu_budget - 1)
+            if not errors:
+                return
+            # 任一目标超出即增加跳帧, 全部满足时逐步减少跳帧
+            error = min(max(errors), 1.0)
+            skip_ratio = self._skip_ratio + self._gain * error
+            self._skip_ratio = min(max(skip_ratio, 0.0), self._max_skip_ratio)
+
+    def is_pass(self, source_id: str) -> bool:
+        """
+        Decide whether the next frame of the source is skipped.
+
+        Args:
+            source_id (str): The source of the frame.
+
+        Returns:
+            bool: True if the frame is skipped, False otherwise.
+        """
+        with self._lock:
+            credit = self._credits[source_id] + 1 - self._skip_ratio
+            if credit >= 1:
+                self._credits[source_id] = credit - 1
+                return False
+            self._credits[source_id] = credit
+            return True
@@ -0,0 +1,287 @@
+import time
+import asyncio
+from typing import Any, Dict, Set
+
+import zmq
+import zmq.asyncio
+from loguru import logger
+from wrapyfi.encoders import JsonDecodeHook
+from wrapyfi.publishers import Publishers
+from wrapyfi.listeners.zeromq import SOCKET_IP
+
+from .coral import CoralNode
+from .poller import drain_latest
+from .codec import decode_payload
+from .wire import unpack_message
+from .exception import (
+    CoralSenderIgnoreException,
+    CoralSharedMemoryExhaustedException,
+)
+from .types import RawPayload, ReceiverModel, SenderModel
+
+
+class AsyncCoralNode(CoralNode):
+    """
+    基于 asyncio 的节点运行时
+
+    - `init` / `sender` 为协程函数, 适用于大部分时间在等待 IO 的节点(HTTP 推送, webhook 等)
+    - 接收者基于 zmq.asyncio, 多个接收者共享同一个事件循环
+    - 同时处理中的帧数量由 process.max_concurrency 限制, 达到上限时暂停接收; 输入节点依次产生数据帧
+    - 不支持 process.enable_sync / batch_size / enable_reorder / enable_fair_queue, 开启时打印警告并忽略
+    - 共享内存、跳帧与监控指标的处理与 CoralNode 一致
+    """
+
+    def __init__(self, config_path: str = None):
+        super().__init__(config_path=config_path)
+        self.__check_unsupported_config()
+        self._publisher = self.__init_publisher(self.meta.sender)
+        # 事件循环只保留任务的弱引用, 处理中的任务需持有引用, 避免被垃圾回收
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _init_poller(self):
+        # 接收者基于 zmq.asyncio 在事件循环中创建, 不使用 wrapyfi 的接收者
+        self.receivers = []
+        return None
+
+    def __check_unsupported_config(self):
+        """没有工作线程与任务队列, 依赖它们的配置不生效"""
+        process = self.process
+        unsupported = {
+            "enable_sync": process.enable_sync,
+            "batch_size": process.batch_size > 1,
+            "enable_reorder": process.enable_reorder,
+            "enable_fair_queue": process.enable_fair_queue,
+        }
+        for name, enabled in unsupported.items():
+            if enabled:
+                logger.warning(
+                    f"{self.config.node_id}: AsyncCoralNode 不支持 process.{name}, 该配置不生效"
+                )
+
+    def __init_publisher(self, meta: SenderModel):
+        """
+        Initialize the wrapyfi publisher for the given SenderModel object.
+
+        Parameters:
+            meta (SenderModel): The sender metadata.
+
+        Returns:
+            Publisher: The publisher, or None if the node has no sender.
+        """
+        if meta is None:
+            logger.warning(f"{self.__class__.__name__} sender is None!")
+            return None
+        publisher = Publishers.registry[f"{meta.data_type}:{meta.mware}"](
+            meta.cls_name,
+            meta.topic,
+            carrier=meta.carrier,
+            should_wait=meta.blocking,
+            socket_sub_port=meta.socket_sub_port,
+            socket_pub_port=meta.socket_pub_port,
+            proxy_broker_spawn="thread",
+            pubsub_monitor_listener_spawn="thread",
+            **meta.params,
+        )
+        publisher.establish()
+        return publisher
+
+    def __init_async_receiver(self, meta: ReceiverModel) -> zmq.asyncio.Socket:
+        """
+        Initialize a zmq.asyncio subscriber compatible with the wrapyfi zeromq publisher.
+
+        Parameters:
+            meta (ReceiverModel): The receiver metadata.
+
+        Returns:
+            zmq.asyncio.Socket: The connected subscriber socket.
+        """
+        socket = zmq.asyncio.Context.instance().socket(zmq.SUB)
+        socket.connect(f"{meta.carrier}://{SOCKET_IP}:{meta.socket_pub_port}")
+        socket.setsockopt_string(zmq.SUBSCRIBE, meta.topic)
+        return socket
+
+    async def __handle(
+        self, payload: RawPayload, context: Dict, semaphore: asyncio.Semaphore
+    ):
+        """
+        Run the sender coroutine on a payload and publish the result.
+
+        Parameters:
+            payload (RawPayload): The payload to process.
+            context (Dict): The node context.
+            semaphore (asyncio.Semaphore): The concurrency limit, released when done.
+
+        Returns:
+            None
+        """
+        try:
+            start_time = time.time()
+            sender_payload = await self.sender(payload, context)
+            data = self._dispatch_payload(payload, sender_payload, start_time)
+            if self._publisher is not None:
+                self._share_payload(self.meta.sender.topic, data)
+                self._publisher.publish(data)
+        except CoralSenderIgnoreException:
+            payload.release_shared_memory()
+        except CoralSharedMemoryExhaustedException as e:
+            logger.warning(f"drop frame: {e}")
+            self.metrics.count_shm_exhausted_drop_frames()
+            payload.release_shared_memory()
+        except Exception as e:
+            logger.exception(f"__handle func error: {e}")
+            payload.release_shared_memory()
+        finally:
+            semaphore.release()
+
+    def __on_async_payload(
+        self, payload: RawPayload, context: Dict, semaphore: asyncio.Semaphore
+    ):
+        # 接收时已超过最大帧龄的数据帧直接丢弃
+        if self._is_expired(payload):
+            self.metrics.count_expired_drop_frames()
+            payload.release_shared_memory()
+            semaphore.release()
+            return
+        is_pass = self._record_and_just_is_pass_frame(
+            recv_node_id=payload.source_id, timestamp=payload.timestamp
+        )
+        if is_pass:
+            # 被skip的帧也需要释放共享内存
+            payload.release_shared_memory()
+            semaphore.release()
+            logger.debug(f"{payload.source_id} frame is passed!")
+            return
+        task = asyncio.create_task(self.__handle(payload, context, semaphore))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.logger_fps()
+
+    async def __run_async_receiver(
+        self, meta: ReceiverModel, context: Dict, semaphore: asyncio.Semaphore
+    ):
+        socket = self.__init_async_receiver(meta)
+        # conflate 模式下通过同步 socket 非阻塞地取出全部积压消息
+        sync_socket = zmq.Socket.shadow(socket.underlying)
+        decoder_hook = JsonDecodeHook(**meta.params).object_hook
+        while self.is_running:
+            # 达到并发上限时暂停接收, 数据积压在 zmq 的接收缓冲中
+            await semaphore.acquire()
+            try:
+                if not await socket.poll(timeout=self.process.poll_timeout):
+                    semaphore.release()
+                    continue
+                if meta.conflate:
+                    messages, superseded = drain_latest(sync_socket)
+                    self._drop_superseded_messages(superseded)
+                else:
+                    messages = [(await socket.recv_multipart(copy=False))[1:]]
+            except Exception as e:
+                logger.exception(f"{meta.topic} receive error: {e}")
+                semaphore.release()
+                continue
+            if not messages:
+                semaphore.release()
+                continue
+            for idx, message in enumerate(messages):
+                # 第一帧使用已获取的并发额度
+                if idx > 0:
+                    await semaphore.acquire()
+                try:
+                    data = unpack_message(message, object_hook=decoder_hook)
+                    payload: RawPayload = decode_payload(
+                        meta.payload_cls, data, self.enable_shared_memory
+                    )
+                except CoralSharedMemoryExhaustedException as e:
+                    logger.warning(f"{meta.topic} drop frame: {e}")
+                    self.metrics.count_shm_exhausted_drop_frames()
+                    semaphore.release()
+                    continue
+                except Exception as e:
+                    logger.exception(f"{meta.topic} receive error: {e}")
+                    semaphore.release()
+                    continue
+                self._fps_sampler.set_target_fps(payload.source_id, meta.target_fps)
+                # 从上一个节点发送到该节点接受耗时
+                self.metrics.cost_pendding_frames(time.time() - payload.timestamp)
+                self.__on_async_payload(payload, context, semaphore)
+        socket.close()
+        logger.info(f"{meta.topic} async receiver check is_running is False, stoped!")
+
+    async def __run_async_source(self, context: Dict, semaphore: asyncio.Semaphore):
+        """无接收者的节点(输入节点), 由 sender 驱动产生数据"""
+        while self.is_running:
+            await semaphore.acquire()
+            payload = RawPayload(
+                source_id=self.config.node_id,
+                enable_shared_memory=self.enable_shared_memory,
+            )
+            self.__on_async_payload(payload, context, semaphore)
+            # 让出事件循环, 使处理中的任务得以执行
+            await asyncio.sleep(0)
+
+    async def on_async_receivers(self):
+        """
+        Run all receivers on the event loop until the node stops.
+
+        Returns:
+            None
+        """
+        context = {}
+        await self.init(context)
+        logger.info(f"{self.config.node_id} init context: {context}")
+        if self.meta.receivers:
+            semaphore = asyncio.Semaphore(self.process.max_concurrency)
+            tasks = [
+                self.__run_async_receiver(meta, context, semaphore)
+                for meta in self.meta.receivers
+            ]
+        else:
+            logger.warning("no receiver, use default receiver!!!")
+            # 输入节点的数据帧依次产生, 并发执行 sender 会打乱帧的顺序
+            semaphore = asyncio.Semaphore(1)
+            tasks = [self.__run_async_source(context, semaphore)]
+        await asyncio.gather(*tasks)
+        # 等待处理中的帧完成, 释放其共享内存
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def init(self, context: Dict[str, Any]):
+        """
+        Initializes the object with the provided context.
+
+        Parameters:
+            context (Dict[str, Any]): A dictionary containing the context information.
+
+        Raises:
+            NotImplementedError: This method is not implemented and should be overridden in a subclass.
+        """
+        raise NotImplementedError
+
+    async def sender(
+        self, payload: RawPayload, context: Dict[str, Any]
+    ) -> RawPayload:
+        """
+        Send a payload to the recipient.
+
+        Args:
+            payload (RawPayload): The payload to be sent.
+            context (Dict[str, Any]): The context in which the payload is sent.
+
+        Raises:
+            NotImplementedError: If the send operation is not implemented.
+        """
+        raise NotImplementedError
+
+    def run(self):
+        """
+        Run the node on an asyncio event loop.
+
+        Returns:
+            None
+        """
+        if self.is_running:
+            logger.error("AsyncCoralNode is already running!")
+            return
+        # 设置为正在运行
+        self._is_running = True
+        asyncio.run(self.on_async_receivers())
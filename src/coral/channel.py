@@ -0,0 +1,148 @@
+import copy
+from threading import Condition, Lock
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, List, Union
+
+from .types import RawPayload
+
+
+def _source_id(payload: Union[RawPayload, Dict]) -> str:
+    if isinstance(payload, dict):
+        return payload.get("source_id")
+    return payload.source_id
+
+
+def _copy_payload(payload: Union[RawPayload, Dict]) -> Union[RawPayload, Dict]:
+    """
+    Copy a payload for another subscriber of the same topic.
+
+    The raw data is shared by reference, objects and metas are copied because
+    the subscribers fill their results into them in place.
+    """
+    if isinstance(payload, dict):
+        # model_dump 的数据在接收时会重新构造, 不会被修改
+        return payload
+    return payload.model_copy(
+        update={
+            "objects": copy.deepcopy(payload.objects),
+            "metas": copy.deepcopy(payload.metas),
+        }
+    )
+
+
+class PayloadChannel:
+    """
+    进程内流水线中一个接收者的有界通道
+
+    - 上游节点直接放入 RawPayload 对象, 不做序列化
+    - 满时丢弃最旧的数据帧, 开启 conflate 时同一数据源只保留最新的一帧
+    - 同一节点的所有通道共享一个 Condition, 由 ChannelPoller 等待任一通道有数据
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        condition: Condition,
+        conflate: bool = False,
+        drop: Callable[[Any, bool], None] = None,
+    ):
+        self._maxsize = maxsize
+        self._condition = condition
+        self._conflate = conflate
+        # drop(payload, superseded), superseded 为 True 表示被同一数据源的新帧覆盖
+        self._drop = drop or (lambda payload, superseded: None)
+        self._items = deque()
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, payload: Union[RawPayload, Dict]):
+        dropped = []
+        with self._condition:
+            if self._conflate:
+                source_id = _source_id(payload)
+                for item in [i for i in self._items if _source_id(i) == source_id]:
+                    self._items.remove(item)
+                    dropped.append((item, True))
+            if len(self._items) >= self._maxsize:
+                dropped.append((self._items.popleft(), False))
+            self._items.append(payload)
+            self._condition.notify()
+        for item, superseded in dropped:
+            self._drop(item, superseded)
+
+    def get_nowait(self) -> Union[RawPayload, Dict]:
+        with self._condition:
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+
+class ChannelHub:
+    """
+    进程内流水线的 topic 路由
+
+    - 接收者按 topic 订阅通道, 发送者按 topic 发布
+    - 同一 topic 有多个订阅者时, 第一个订阅者拿到原对象, 其余订阅者拿到共享 raw 的副本
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._channels: Dict[str, List[PayloadChannel]] = defaultdict(list)
+
+    def subscribe(self, topic: str, channel: PayloadChannel):
+        with self._lock:
+            self._channels[topic].append(channel)
+
+    def publish(self, topic: str, payload: Union[RawPayload, Dict]):
+        """
+        Deliver a payload to every channel subscribed to the topic.
+
+        Args:
+            topic (str): The topic of the sender.
+            payload (Union[RawPayload, Dict]): The payload, or its model_dump when published by a worker process.
+        """
+        with self._lock:
+            channels = list(self._channels.get(topic, []))
+        if not channels:
+            return
+        # 先复制再投递, 避免第一个订阅者已开始修改原对象
+        payloads = [payload] + [_copy_payload(payload) for _ in channels[1:]]
+        for channel, item in zip(channels, payloads):
+            channel.put(item)
+
+
+class ChannelPoller:
+    """
+    进程内流水线的接收者轮询器, 接口与 ReceiverPoller 一致
+
+    - 所有通道为空时阻塞等待, 任一通道有数据时唤醒
+    - conflate 在通道放入时已处理, 接收时不需要再合并
+    """
+
+    def __init__(
+        self,
+        channels: List[PayloadChannel],
+        receivers: List[Callable],
+        condition: Condition,
+        timeout: int,
+    ):
+        self._channels = channels
+        self._receivers = receivers
+        self._condition = condition
+        # 单位: 毫秒
+        self._timeout = timeout
+
+    def poll(self) -> List[Callable]:
+        with self._condition:
+            self._condition.wait_for(
+                lambda: any(self._channels), self._timeout / 1000
+            )
+        return [
+            receiver
+            for channel, receiver in zip(self._channels, self._receivers)
+            if channel
+        ]
+
+    def is_conflated(self, receiver: Callable) -> bool:
+        return False
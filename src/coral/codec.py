@@ -0,0 +1,106 @@
+from typing import Any, Dict, Type
+
+from loguru import logger
+from pydantic_core import PydanticSerializationError
+
+from .types import RawPayload, PayloadFormat
+from .compress import CompressedRaw, compress_raw
+
+# 可信格式中, 由 pydantic-core 序列化的数据帧 json 所在的字段
+TRUSTED_PAYLOAD_KEY = "coral_payload"
+# 不放入 json 的字段: raw 与共享内存id及其分配次数单独传递
+_TRUSTED_EXCLUDE = {"raw", "raw_shared_memory_id", "raw_generation"}
+
+
+def _raw_fields(
+    payload: RawPayload, raw_codec: str = None, raw_quality: int = None
+) -> Dict[str, Any]:
+    """raw 随消息发送时的字段, 按发送者的配置压缩; 收到的压缩 raw 未解码时原样转发"""
+    raw = payload._raw
+    if isinstance(raw, CompressedRaw):
+        return {"raw": raw.data, "raw_codec": raw.codec}
+    if raw is None or not raw_codec:
+        return {"raw": raw}
+    return {"raw": compress_raw(raw, raw_codec, raw_quality), "raw_codec": raw_codec}
+
+
+def encode_payload(
+    payload: RawPayload,
+    payload_format: str = PayloadFormat.NATIVE,
+    raw_codec: str = None,
+    raw_quality: int = None,
+) -> Dict[str, Any]:
+    """
+    Dump a payload for sending to other Coral nodes.
+
+    The trusted format serializes the payload to a json string in pydantic-core,
+    skipping model_dump and the per-container walk of the wrapyfi encoder. The
+    source id and the raw data (or its shared memory id) stay top-level, so the
+    message can still be inspected without decoding. The binary format sends the
+    same data, packed into frames by the binary publisher.
+
+    When the raw data is sent with the message, it is compressed with raw_codec.
+    A received compressed raw that was never accessed is forwarded as is.
+
+    Args:
+        payload (RawPayload): The payload to send.
+        payload_format (str): The format of the sender, see PayloadFormat.
+        raw_codec (str, optional): The codec of the raw data, see RawCodec.
+        raw_quality (int, optional): The quality of the codec.
+
+    Returns:
+        Dict[str, Any]: The data to send.
+    """
+    shared = payload._enable_shared_memory
+    if payload_format == PayloadFormat.NATIVE:
+        if shared or not (raw_codec or isinstance(payload._raw, CompressedRaw)):
+            return payload.model_dump()
+        data = payload.model_dump(exclude={"raw"})
+        data.update(_raw_fields(payload, raw_codec, raw_quality))
+        return data
+    try:
+        dumped = payload.__pydantic_serializer__.to_json(
+            payload, exclude=_TRUSTED_EXCLUDE
+        )
+    except PydanticSerializationError as e:
+        # 自定义数据帧中存在无法序列化为 json 的字段时, 使用原格式
+        logger.warning(f"{payload.__class__.__name__} trusted encode failed: {e}")
+        return encode_payload(payload, PayloadFormat.NATIVE, raw_codec, raw_quality)
+    data = {"source_id": payload.source_id}
+    if shared:
+        data["raw_shared_memory_id"] = payload.raw_shared_memory_id
+        data["raw_generation"] = payload.raw_generation
+    else:
+        data.update(_raw_fields(payload, raw_codec, raw_quality))
+    data[TRUSTED_PAYLOAD_KEY] = dumped.decode()
+    return data
+
+
+def decode_payload(
+    payload_cls: Type[RawPayload], data: Dict[str, Any], enable_shared_memory: bool
+) -> RawPayload:
+    """
+    Build a received payload, accepting both payload formats.
+
+    Args:
+        payload_cls (Type[RawPayload]): The payload class of the receiver.
+        data (Dict[str, Any]): The received data.
+        enable_shared_memory (bool): Whether shared memory is enabled on this node.
+
+    Returns:
+        RawPayload: The payload.
+    """
+    if TRUSTED_PAYLOAD_KEY not in data:
+        return payload_cls(**data, enable_shared_memory=enable_shared_memory)
+    # 解析与校验均在 pydantic-core 中完成, 不经过 python 字典
+    payload = payload_cls.model_validate_json(data[TRUSTED_PAYLOAD_KEY])
+    payload._init_private_field(
+        {
+            "raw": data.get("raw"),
+            "raw_codec": data.get("raw_codec"),
+            "raw_shared_memory_id": data.get("raw_shared_memory_id"),
+            "raw_generation": data.get("raw_generation"),
+            "enable_shared_memory": enable_shared_memory,
+        }
+    )
+    return payload
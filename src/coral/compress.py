@@ -0,0 +1,89 @@
+from typing import List
+
+import cv2
+import numpy as np
+
+
+class RawCodec:
+    """
+    raw 随消息发送时的压缩编码
+    """
+
+    # 有损, 体积最小, 4通道图片会丢弃 alpha 通道
+    JPEG = "jpeg"
+    # 无损, quality 为压缩级别
+    PNG = "png"
+    # quality 为空或大于100时无损
+    WEBP = "webp"
+
+
+RAW_CODECS = [RawCodec.JPEG, RawCodec.PNG, RawCodec.WEBP]
+
+_EXTENSIONS = {RawCodec.JPEG: ".jpg", RawCodec.PNG: ".png", RawCodec.WEBP: ".webp"}
+_QUALITY_FLAGS = {
+    RawCodec.JPEG: cv2.IMWRITE_JPEG_QUALITY,
+    RawCodec.PNG: cv2.IMWRITE_PNG_COMPRESSION,
+    RawCodec.WEBP: cv2.IMWRITE_WEBP_QUALITY,
+}
+
+
+def _encode_params(codec: str, quality: int = None) -> List[int]:
+    if quality is None:
+        return []
+    return [_QUALITY_FLAGS[codec], int(quality)]
+
+
+def compress_raw(raw: np.ndarray, codec: str, quality: int = None) -> np.ndarray:
+    """
+    Compress the raw data with OpenCV.
+
+    Args:
+        raw (np.ndarray): The raw data, an image array.
+        codec (str): The codec, see RawCodec.
+        quality (int, optional): 1-100 for jpeg and webp, the compression level 0-9 for png.
+            The OpenCV default is used when empty.
+
+    Returns:
+        np.ndarray: The compressed bytes as a 1-D uint8 array.
+    """
+    ok, encoded = cv2.imencode(
+        _EXTENSIONS[codec], raw, _encode_params(codec, quality)
+    )
+    if not ok:
+        raise ValueError(f"raw {raw.shape} {raw.dtype} 无法压缩为 {codec}")
+    return encoded.reshape(-1)
+
+
+def decompress_raw(encoded: np.ndarray) -> np.ndarray:
+    """
+    Decode the compressed raw data, the codec is detected from the data.
+
+    Args:
+        encoded (np.ndarray): The compressed bytes as a 1-D uint8 array.
+
+    Returns:
+        np.ndarray: The raw data, keeping the channels of the compressed image.
+    """
+    raw = cv2.imdecode(encoded, cv2.IMREAD_UNCHANGED)
+    if raw is None:
+        raise ValueError(f"压缩的 raw 解码失败, 长度: {encoded.nbytes}")
+    return raw
+
+
+class CompressedRaw:
+    """
+    收到的压缩 raw, 在首次访问时解码
+    """
+
+    __slots__ = ("data", "codec")
+
+    def __init__(self, data: np.ndarray, codec: str):
+        self.data = data
+        self.codec = codec
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def decompress(self) -> np.ndarray:
+        return decompress_raw(self.data)
@@ -6,6 +6,8 @@ CORAL_NODE_CONFIG_PATH = os.environ.get("CORAL_NODE_CONFIG_PATH")
 CORAL_NODE_BASE64_DATA = os.environ.get("CORAL_NODE_BASE64_DATA")
 
 DEFAULT_NO_TOPIC = "/no_topic"
+# 二进制传输格式注册到 wrapyfi 的数据类型
+BINARY_DATA_TYPE = "CoralBinary"
 DEFAULT_NO_RECEVIER_MSG = "#no_recevier#"
 
 # 所有node统一挂载的路径
@@ -23,6 +25,27 @@ SHARED_MEMORY_ID_STORE_DIR = os.path.join(MOUNT_PATH, "shared_memory_ids")
 os.makedirs(SHARED_MEMORY_ID_STORE_DIR, exist_ok=True)
 # shared memory lock file
 DELETE_SHARED_MEMORY_LOCK = os.path.join(LOCK_DIR, "shared_memory_delete.lock")
+# 共享内存槽位池的名称前缀
+SHARED_MEMORY_POOL_PREFIX = "coralpool-"
+# 按帧创建的带引用计数的共享内存的名称前缀
+SHARED_MEMORY_FRAMES_PREFIX = "coralframes-"
+# 每个节点同时存在的按帧创建的共享内存的上限, 超出后不再记录引用计数
+SHARED_MEMORY_FRAMES_SIZE = 1024
+# 共享内存的下游节点注册目录
+SHARED_MEMORY_CONSUMER_DIR = os.path.join(MOUNT_PATH, "shared_memory_consumers")
+os.makedirs(SHARED_MEMORY_CONSUMER_DIR, exist_ok=True)
+# 下游节点的注册有效期(秒), 节点运行期间定时刷新
+SHARED_MEMORY_CONSUMER_TTL = 10
+# 共享内存记录日志的有效期(秒), 节点运行期间定时刷新, 超过有效期视为节点已退出
+SHARED_MEMORY_JOURNAL_TTL = 30
+# 主机级共享内存清理的选举锁
+SHARED_MEMORY_JANITOR_LOCK = os.path.join(LOCK_DIR, "shared_memory_janitor.lock")
+# 主机级共享内存清理的间隔(秒), 0为节点中不运行
+CORAL_SHARED_MEMORY_JANITOR_INTERVAL = int(
+    os.environ.get("CORAL_SHARED_MEMORY_JANITOR_INTERVAL", 60)
+)
+# SharedArray 创建的共享内存所在的目录
+SHARED_MEMORY_DIR = "/dev/shm"
 
 # 节点共享内存过期时间
 CORAL_NODE_SHARED_MEMORY_EXPIRE = int(
@@ -1,11 +1,13 @@
 import atexit
 import time
 import json
+import queue
 import requests
+import multiprocessing
 from enum import Enum
 from urllib.parse import urljoin
 from typing import Callable, Dict, List, Any, Union
-from threading import Thread
+from threading import Thread, Condition
 from collections import defaultdict, deque
 
 from loguru import logger
@@ -14,6 +16,7 @@ from wrapyfi.connect.wrapper import MiddlewareCommunicator
 from .constants import (
     DEFAULT_NO_RECEVIER_MSG,
     CORAL_NODE_SHARED_MEMORY_EXPIRE,
+    CORAL_SHARED_MEMORY_JANITOR_INTERVAL,
     CORAL_NODE_CONFIG_PATH,
     CORAL_NODE_BASE64_DATA,
     NODE_ID,
@@ -24,9 +27,19 @@ from .constants import (
 from .parse import CoralParser
 from .parser import BaseParse
 from .metrics import CoralNodeMetrics
+from .adaptive import AdaptiveSkipController
+from .sampling import FpsSampler
+from .poller import ReceiverPoller, shared_memory_id, shared_memory_generation
+from .channel import ChannelHub, ChannelPoller, PayloadChannel
+from .queues import PayloadQueue, FairPayloadQueue
+from .reorder import ReorderBuffer
+from .sync import FrameSynchronizer
+from .codec import encode_payload, decode_payload
 from .sched import bg_tasks, SharedMemoryIDManager
+from .janitor import SharedMemoryJanitor
 from .exception import (
     CoralSenderIgnoreException,
+    CoralSharedMemoryExhaustedException,
 )
 from .types import (
     MetaModel,
@@ -35,6 +48,8 @@ from .types import (
     ReceiverModel,
     ModeModel,
     ProcessModel,
+    RunMode,
+    PayloadFormat,
     RawPayload,
     FirstPayload,
     BaseInterfacePayload,
@@ -63,13 +78,31 @@ class CoralNode(MiddlewareCommunicator):
 
     config_fp: str = "config.json"
 
-    def __init__(self):
+    def __init__(
+        self,
+        config_path: str = None,
+        channels: ChannelHub = None,
+        registry_module: str = None,
+    ):
+        """
+        Parameters:
+            config_path (str, optional): The config file, defaults to the environment or cls.config_fp.
+            channels (ChannelHub, optional): The in-process channels of a CoralPipeline, replaces wrapyfi when set.
+            registry_module (str, optional): Only use the params/return classes defined in this module, defaults to all registered classes.
+        """
         self.check_required_config()
-        config_path, file_type = self.get_config()
-        self.__config = CoralParser.parse(config_path, file_type)
+        if config_path is None:
+            config_path, file_type = self.get_config()
+        else:
+            file_type = config_path.split(".")[-1]
+        self.__config = CoralParser.parse(config_path, file_type, registry_module)
+        self._channels = channels
         self._queue = self.__queue()
         self._process_cls = self.__process_cls()
-        self.receivers = self.__init_receivers(self.meta.receivers)
+        # 保序发送缓冲, 在启动后台worker时创建
+        self._reorder: ReorderBuffer = None
+        self._receiver_metas: Dict[str, ReceiverModel] = {}
+        self._poller = self._init_poller()
         # run time
         self.run_time = time.time()
         # fps cal
@@ -85,14 +118,39 @@ class CoralNode(MiddlewareCommunicator):
         )
         # skip frame recorder
         self.receiver_frames_count = defaultdict(int)
+        # 按目标帧率采样
+        self._fps_sampler = FpsSampler(target_fps=self.config.generic.target_fps)
+        # 自适应跳帧控制器
+        self._skip_controller = self.__skip_controller()
+        # 数据源对应接收者的调度权重
+        self.source_weights = defaultdict(lambda: 1)
+        # 多接收者时间戳对齐, 组内首帧 raw_id -> 同组其他接收者的帧
+        self._synchronizer = self.__init_synchronizer()
+        self._sync_groups: Dict[str, List[RawPayload]] = {}
         # start bg tasks
         self.bg_tasks = bg_tasks
         # set node state
         self._is_running = False
         # shared memory manager
         self.shared_memory_mamager = SharedMemoryIDManager(
-            manager_id=self.config.node_id, expire=CORAL_NODE_SHARED_MEMORY_EXPIRE
+            manager_id=self.config.node_id,
+            expire=CORAL_NODE_SHARED_MEMORY_EXPIRE,
+            pool_size=self.config.generic.shared_memory_pool_size,
         )
+        # 注册为上游共享内存的下游节点, 上游按下游节点数记录引用计数
+        if self._channels is None:
+            for meta in self.meta.receivers or []:
+                self.shared_memory_mamager.register_consumer(
+                    meta.topic, self.config.node_id
+                )
+        # 主机级的共享内存清理, 由选举出的一个节点定时运行
+        if self.enable_shared_memory and CORAL_SHARED_MEMORY_JANITOR_INTERVAL > 0:
+            SharedMemoryJanitor().run_elected(
+                CORAL_SHARED_MEMORY_JANITOR_INTERVAL,
+                report=lambda result: self.metrics.count_shm_reclaimed_bytes(
+                    result["bytes"]
+                ),
+            )
         # exit register
         atexit.register(self.shutdown)
 
@@ -160,6 +218,10 @@ class CoralNode(MiddlewareCommunicator):
     def enable_shared_memory(self):
         return self.config.generic.enable_shared_memory
 
+    @property
+    def enable_batch(self):
+        return self.process.batch_size > 1
+
     @property
     def config(self) -> BaseParse:
         return self.__config
@@ -196,14 +258,105 @@ class CoralNode(MiddlewareCommunicator):
 
     def __queue(self):
         """
-        Return a queue object based on the run mode of the process.
+        Return the bounded blocking queue that feeds the background workers.
 
         Returns:
-            - If the run mode is 'threads', return a queue.Queue object with a maximum size of self.process.max_qsize.
-            - If the run mode is not 'threads', return a multiprocessing.Queue object with a maximum size of self.process.max_qsize.
+            PayloadQueue: A queue holding at most self.process.max_qsize payloads and
+            self.process.max_qmemory MB of payloads, dropping the oldest payloads when
+            full. With self.process.enable_fair_queue the count limit applies per source
+            and sources are served by weighted round-robin.
         """
+        queue_cls = PayloadQueue
+        if self.process.enable_fair_queue:
+            queue_cls = FairPayloadQueue
         # 默认一秒可以处理60个数据，最大存储3秒的数据
-        return deque(maxlen=self.process.max_qsize)
+        return queue_cls(
+            maxsize=self.process.max_qsize,
+            max_bytes=self.process.max_qmemory * 1024 * 1024,
+            sizeof=lambda payload: payload.nbytes,
+        )
+
+    def __skip_controller(self):
+        """
+        Return the adaptive skip controller when a target latency or CPU budget is configured.
+
+        Returns:
+            AdaptiveSkipController: The controller, or None to use the fixed skip_frame count.
+        """
+        generic = self.config.generic
+        if generic.target_latency <= 0 and generic.cpu_budget <= 0:
+            return None
+        return AdaptiveSkipController(
+            target_latency=generic.target_latency / 1000,
+            cpu_budget=generic.cpu_budget,
+        )
+
+    def __init_synchronizer(self):
+        """
+        Return the frame synchronizer of the receivers when process.enable_sync is set.
+
+        Returns:
+            FrameSynchronizer: The synchronizer, or None if disabled.
+        """
+        if not self.process.enable_sync:
+            return None
+        if not self.meta.receivers:
+            logger.warning("enable_sync without receivers, ignored!")
+            return None
+        return FrameSynchronizer(
+            keys=[meta.node_id for meta in self.meta.receivers],
+            tolerance=self.process.sync_tolerance / 1000,
+            maxsize=self.process.sync_qsize,
+            drop=self.__drop_unsynced_payload,
+        )
+
+    def __drop_unsynced_payload(self, payload: RawPayload):
+        """丢弃无法对齐的数据帧"""
+        self.metrics.count_sync_drop_frames()
+        payload.release_shared_memory()
+
+    def __sync_payload(self, node_id: str, payload: RawPayload) -> RawPayload:
+        """
+        Buffer the payload until it is aligned with the frames of the other receivers.
+
+        Parameters:
+            node_id (str): The node_id of the receiver the payload came from.
+            payload (RawPayload): The received payload.
+
+        Returns:
+            RawPayload: The first payload of the completed group, None if no group is complete.
+        """
+        group = self._synchronizer.put(node_id, payload)
+        if group is None:
+            return None
+        leader, *followers = group
+        self._sync_groups[leader.raw_id] = followers
+        return leader
+
+    def __release_payload(self, payload: RawPayload):
+        """释放数据帧及其同组数据帧的共享内存"""
+        payload.release_shared_memory()
+        for follower in self._sync_groups.pop(payload.raw_id, []):
+            follower.release_shared_memory()
+
+    def __send_group(self, payload: RawPayload, context: Dict) -> ReturnPayload:
+        """
+        Runs sender_group on the payload and the frames aligned with it.
+
+        Parameters:
+            payload (RawPayload): The first payload of the group.
+            context (Dict): The worker context.
+
+        Returns:
+            ReturnPayload: The result of sender_group.
+        """
+        try:
+            followers = self._sync_groups[payload.raw_id]
+            return self.sender_group([payload, *followers], context)
+        finally:
+            # 同组其他接收者的帧只用于处理, 不向下游发送
+            for follower in self._sync_groups.pop(payload.raw_id, []):
+                follower.release_shared_memory()
 
     def __process_cls(self):
         """
@@ -216,6 +369,9 @@ class CoralNode(MiddlewareCommunicator):
             Type: Either `Thread` or `multiprocessing.Process`
 
         """
+        if self.process.run_mode == RunMode.PROCESS:
+            # fork 启动, 子进程直接继承节点实例, 无需序列化节点对象
+            return multiprocessing.get_context("fork").Process
         return Thread
 
     def __init_sender(self, meta: SenderModel, sender_func: Callable = None):
@@ -237,6 +393,9 @@ class CoralNode(MiddlewareCommunicator):
             logger.warning(f"{self.__class__.__name__} sender is None!")
             return func
 
+        if self._channels is not None:
+            return self.__init_channel_sender(meta, func)
+
         func = MiddlewareCommunicator.register(
             meta.data_type,
             meta.mware,
@@ -249,10 +408,36 @@ class CoralNode(MiddlewareCommunicator):
             proxy_broker_spawn="thread",
             pubsub_monitor_listener_spawn="thread",
             **meta.params,
-        )(func)
+        )(self.__init_sharing_sender(meta, func))
         self.activate_communication(func, mode=self.mode.sender)
         return func
 
+    def __init_sharing_sender(self, meta: SenderModel, func: Callable):
+        """
+        Wrap a sender function so that the shared memory of its result is handed to the consumers.
+
+        wrapyfi publishes the result right after the wrapped function returns, a frame
+        dropped before publishing (e.g. by the reorder buffer) still holds only the
+        reference of this node.
+
+        Parameters:
+            meta (SenderModel): The sender metadata.
+            func (Callable): The sender function returning a tuple whose first item is the data.
+
+        Returns:
+            Callable: The wrapped sender function.
+        """
+
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if result[0] is not None:
+                self._share_payload(meta.topic, result[0])
+            return result
+
+        # wrapyfi 按 __qualname__ 登记发布者, 保持与原函数一致
+        wrapper.__name__, wrapper.__qualname__ = func.__name__, func.__qualname__
+        return wrapper
+
     def __init_receivers(self, metas: List[ReceiverModel]):
         """
         Initializes a list of receiver functions based on the given receiver models.
@@ -287,6 +472,7 @@ class CoralNode(MiddlewareCommunicator):
                 should_wait=meta.blocking,
                 payload_cls=meta.payload_cls,
                 node_id=meta.node_id,
+                conflate=meta.conflate,
                 socket_sub_port=meta.socket_sub_port,
                 socket_pub_port=meta.socket_pub_port,
                 proxy_broker_spawn="thread",
@@ -295,17 +481,114 @@ class CoralNode(MiddlewareCommunicator):
             )(func)
             self.activate_communication(receiver, mode=self.mode.receiver)
             receivers.append(receiver)
+            self._receiver_metas[receiver.__qualname__] = meta
         if not receivers:
             logger.warning("no receiver, use default receiver!!!")
             receivers.append(default_func)
         return receivers
 
+    def __init_channel_sender(self, meta: SenderModel, func: Callable):
+        """
+        Wrap a sender function so that its result is published to the in-process channels.
+
+        Parameters:
+            meta (SenderModel): The sender metadata.
+            func (Callable): The sender function returning a tuple whose first item is the data.
+
+        Returns:
+            Callable: The wrapped sender function.
+        """
+
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if result[0] is not None:
+                self._channels.publish(meta.topic, result[0])
+            return result
+
+        return self.__pubsub_func_wrapper(func.__name__, wrapper)
+
+    def _share_payload(self, topic: str, data: Dict):
+        """
+        Hand one shared memory reference to every consumer of the topic, right before publishing.
+
+        Every consumer releases the shared memory once. Without any consumer nobody
+        would release it, so the reference of this node is released instead.
+
+        Parameters:
+            topic (str): The topic of the sender.
+            data (Dict): The dumped payload.
+        """
+        memory_id = data.get("raw_shared_memory_id")
+        if not memory_id:
+            return
+        generation = data.get("raw_generation")
+        consumers = self.shared_memory_mamager.consumers(topic)
+        if consumers == 0:
+            self.shared_memory_mamager.remove(memory_id, generation)
+        else:
+            self.shared_memory_mamager.share(memory_id, consumers, generation)
+
+    def _init_poller(self) -> Union[ReceiverPoller, ChannelPoller]:
+        """
+        Initialize the receivers and the poller waiting on them.
+
+        Returns:
+            Union[ReceiverPoller, ChannelPoller]: The poller of the receivers.
+        """
+        if self._channels is not None and self.meta.receivers:
+            return self.__init_channel_receivers(self.meta.receivers)
+        self.receivers = self.__init_receivers(self.meta.receivers)
+        return ReceiverPoller(self.receivers, self.process.poll_timeout)
+
+    def __init_channel_receivers(self, metas: List[ReceiverModel]) -> ChannelPoller:
+        """
+        Subscribes the receivers to the in-process channels.
+
+        Parameters:
+            metas (List[ReceiverModel]): A list of receiver models.
+
+        Returns:
+            ChannelPoller: The poller waiting on the channels.
+        """
+        condition = Condition()
+        channels, self.receivers = [], []
+        for idx, meta in enumerate(metas):
+            channel = PayloadChannel(
+                maxsize=self.process.max_qsize,
+                condition=condition,
+                conflate=meta.conflate,
+                drop=self.__drop_channel_payload,
+            )
+            self._channels.subscribe(meta.topic, channel)
+            receiver = self.__pubsub_func_wrapper(
+                f"__lambda_recevier_{idx}",
+                lambda x, channel=channel: (channel.get_nowait(),),
+            )
+            channels.append(channel)
+            self.receivers.append(receiver)
+            self._receiver_metas[receiver.__qualname__] = meta
+        return ChannelPoller(
+            channels, self.receivers, condition, self.process.poll_timeout
+        )
+
+    def __drop_channel_payload(self, payload: Union[RawPayload, Dict], superseded: bool):
+        """进程内通道满或被同一数据源新帧覆盖时丢弃的数据帧"""
+        if superseded:
+            self.metrics.count_conflate_drop_frames()
+        else:
+            self.metrics.count_full_drop_frames()
+        self.__release_dumped_payload(payload)
+
     def fill_node_data_router(
         self,
         payload: RawPayload,
         sender_payload: Union[FirstPayload, BaseInterfacePayload, ReturnPayload],
     ):
-        if payload.raw is None:
+        if not payload.has_raw or (
+            # 返回的是 alloc_raw 分配的缓冲区
+            isinstance(sender_payload, FirstPayload)
+            and sender_payload.raw is payload._raw
+        ):
             self._input_node_data_fill(payload, sender_payload)
         elif isinstance(sender_payload, BaseInterfacePayload):
             self._interface_node_data_fill(payload, sender_payload)
@@ -353,6 +636,62 @@ class CoralNode(MiddlewareCommunicator):
         self.metrics.cost_process_frames(process_cost_time)
         self.metrics.crt_node_cost(node_cost_time)
         self.metrics.count_process_frames()
+        self._observe_node_cost(process_cost_time, node_cost_time)
+
+    def _observe_node_cost(self, process_cost_time: float, node_cost_time: float):
+        """将实测耗时反馈给自适应跳帧控制器"""
+        if self._skip_controller is None:
+            return
+        self._skip_controller.observe(process_cost_time, node_cost_time)
+        self.metrics.ratio_skip_frames(self._skip_controller.skip_ratio)
+
+    def _dispatch_payload(
+        self,
+        payload: RawPayload,
+        sender_payload: Union[FirstPayload, BaseInterfacePayload, ReturnPayload],
+        start_time: float,
+    ):
+        """
+        Fill the sender result into the payload and return the data to send.
+
+        Args:
+            payload (RawPayload): The received payload.
+            sender_payload (Union[FirstPayload, BaseInterfacePayload, ReturnPayload]): The result of the sender method.
+            start_time (float): The time the processing of the payload started.
+
+        Returns:
+            Any: The dumped payload, or the sender result when the node has no sender.
+        """
+        # 不存在sender的情况，直接返回
+        if self.meta.sender is None:
+            # 记录节点处理耗时&数量
+            self._record_node_cost(start_time, payload.timestamp)
+            # 没有下游节点, 处理完成后释放数据帧的共享内存
+            payload.release_shared_memory()
+            logger.info(f"{self.config.node_id} no sender, return immediately!")
+            return sender_payload
+
+        self.fill_node_data_router(payload, sender_payload)
+
+        # 记录发送的时间
+        crt_time = time.time()
+        self.sender_times.append(crt_time)
+        # 记录节点处理耗时&数量
+        self._record_node_cost(start_time, payload.timestamp)
+
+        # node整体耗时：从接收到处理
+        payload.nodes_cost += crt_time - payload.timestamp
+        # 更新发送时间
+        payload.timestamp = crt_time
+        # 进程内通道直接传递对象
+        if self._channels is not None:
+            return payload
+        # 根据是否共享内存决定是否返回numpy或者shared_memory_id
+        sender = self.meta.sender
+        # 共享内存的引用在发布前才交给下游节点, 见 _share_payload
+        return encode_payload(
+            payload, sender.payload_format, sender.raw_codec, sender.raw_quality
+        )
 
     def __sender(self, *args, **kwargs):
         """
@@ -361,44 +700,35 @@ class CoralNode(MiddlewareCommunicator):
         Args:
             payload (dict): A dictionary containing the payload data.
             context (dict): A dictionary containing the context data.
+            sender_payload (optional): The result already computed by sender_batch, skips the sender method.
+            start_time (float, optional): The time the processing of the payload started.
 
         Returns:
             Any: The data returned by the sender method.
         """
         try:
-            start_time = time.time()
+            start_time = kwargs.pop("start_time", time.time())
             payload: RawPayload = kwargs.pop("payload", {})
             context: Dict = kwargs.pop("context", {})
-            sender_payload = self.sender(payload, context)
-            # 不存在sender的情况，直接返回
-            if self.meta.sender is None:
-                # 记录节点处理耗时&数量
-                self._record_node_cost(start_time, payload.timestamp)
-                logger.info(f"{self.config.node_id} no sender, return immediately!")
-                return (sender_payload,)
-
-            self.fill_node_data_router(payload, sender_payload)
-
-            # 记录发送的时间
-            crt_time = time.time()
-            self.sender_times.append(crt_time)
-            # 记录节点处理耗时&数量
-            self._record_node_cost(start_time, payload.timestamp)
-
-            # node整体耗时：从接收到处理
-            payload.nodes_cost += crt_time - payload.timestamp
-            # 更新发送时间
-            payload.timestamp = crt_time
-            # model_dump 内部实现了：
-            # 根据是否共享内存决定是否返回numpy或者shared_memory_id
-            data = payload.model_dump()
-            return (data,)
+            # 批处理模式下 sender_payload 已由 sender_batch 计算
+            if "sender_payload" in kwargs:
+                sender_payload = kwargs.pop("sender_payload")
+            elif payload.raw_id in self._sync_groups:
+                sender_payload = self.__send_group(payload, context)
+            else:
+                sender_payload = self.sender(payload, context)
+            return (self._dispatch_payload(payload, sender_payload, start_time),)
         except CoralSenderIgnoreException:
-            payload.release_shared_memory()
+            self.__release_payload(payload)
+            return (None,)
+        except CoralSharedMemoryExhaustedException as e:
+            logger.warning(f"drop frame: {e}")
+            self.metrics.count_shm_exhausted_drop_frames()
+            self.__release_payload(payload)
             return (None,)
         except Exception as e:
             logger.exception(f"__sender func error: {e}")
-            payload.release_shared_memory()
+            self.__release_payload(payload)
             return (None,)
 
     def __init(self):
@@ -442,22 +772,115 @@ class CoralNode(MiddlewareCommunicator):
             None
         """
         context = self.__init()
+        timeout = self.process.poll_timeout / 1000
         while True:
             if not self.is_running:
                 logger.info(
                     "background sender task check is_running is False, stoped!"
                 )
                 break
-            try:
-                payload = self._queue.popleft()
-            except IndexError:
-                # 队列不存在值
-                time.sleep(0.01)
+            if self.enable_batch:
+                payloads = self._queue.get_batch(
+                    self.process.batch_size,
+                    self.process.batch_timeout / 1000,
+                    timeout=timeout,
+                )
+                if payloads:
+                    self.metrics.crt_queue_bytes(self._queue.nbytes)
+                payloads = self.__drop_expired_payloads(payloads)
+                if not payloads:
+                    continue
+                results = self.__send_batch(sender_func, payloads, context)
+            else:
+                # 队列为空时阻塞等待, 超时后重新检查运行状态
+                payload = self._queue.get(timeout=timeout)
+                if payload is None:
+                    continue
+                self.metrics.crt_queue_bytes(self._queue.nbytes)
+                if not self.__drop_expired_payloads([payload]):
+                    continue
+                payloads = [payload]
+                results = [sender_func(self, payload=payload, context=context)[0]]
+            # 保序模式下 sender_func 只处理不发送, 由保序缓冲按序发送
+            if self._reorder is not None:
+                for payload, data in zip(payloads, results):
+                    self._reorder.done(payload.raw_id, data)
+
+    def _is_expired(self, payload: RawPayload) -> bool:
+        """数据帧从上一个节点发送至今是否超过最大帧龄"""
+        max_frame_age = self.config.generic.max_frame_age
+        return max_frame_age > 0 and (
+            time.time() - payload.timestamp > max_frame_age / 1000
+        )
+
+    def __drop_expired_payloads(self, payloads: List[RawPayload]) -> List[RawPayload]:
+        """
+        Drops the dequeued payloads older than generic.max_frame_age.
+
+        Parameters:
+            payloads (List[RawPayload]): The dequeued payloads.
+
+        Returns:
+            List[RawPayload]: The payloads that are still fresh.
+        """
+        fresh = []
+        for payload in payloads:
+            if not self._is_expired(payload):
+                fresh.append(payload)
                 continue
+            self.metrics.count_expired_drop_frames()
+            self.__release_payload(payload)
+            if self._reorder is not None:
+                self._reorder.done(payload.raw_id, None)
+        return fresh
+
+    def __send_batch(
+        self, sender_func: Callable, payloads: List[RawPayload], context: Dict
+    ) -> List[Any]:
+        """
+        Runs sender_batch on a batch of payloads and sends every result frame by frame.
 
-            if payload is None:
+        Parameters:
+            sender_func (Callable): The sender function used for every frame.
+            payloads (List[RawPayload]): The batch of payloads.
+            context (Dict): The worker context.
+
+        Returns:
+            List[Any]: The data returned by sender_func for every payload, None for skipped payloads.
+        """
+        start_time = time.time()
+        try:
+            sender_payloads = self.sender_batch(payloads, context)
+            if len(sender_payloads) != len(payloads):
+                raise ValueError(
+                    f"sender_batch 返回数量 {len(sender_payloads)} 与输入数量 {len(payloads)} 不一致"
+                )
+        except Exception as e:
+            logger.exception(f"sender_batch func error: {e}")
+            for payload in payloads:
+                self.__release_payload(payload)
+            return [None] * len(payloads)
+
+        if self.process.enable_batch_metrics:
+            self.metrics.count_batch_frames(len(payloads))
+            self.metrics.cost_batch_frames(time.time() - start_time)
+
+        results = []
+        for payload, sender_payload in zip(payloads, sender_payloads):
+            # 返回 None 的帧视为忽略
+            if sender_payload is None:
+                self.__release_payload(payload)
+                results.append(None)
                 continue
-            sender_func(self, payload=payload, context=context)
+            (data,) = sender_func(
+                self,
+                payload=payload,
+                context=context,
+                sender_payload=sender_payload,
+                start_time=start_time,
+            )
+            results.append(data)
+        return results
 
     def __on_payload_callback(self, payload: RawPayload, context: Dict = {}):
         """
@@ -470,25 +893,41 @@ class CoralNode(MiddlewareCommunicator):
         Returns:
             None
         """
-        is_pass = self._record_and_just_is_pass_frame(recv_node_id=payload.source_id)
+        # 接收时已超过最大帧龄的数据帧直接丢弃
+        if self._is_expired(payload):
+            self.metrics.count_expired_drop_frames()
+            self.__release_payload(payload)
+            return
+        is_pass = self._record_and_just_is_pass_frame(
+            recv_node_id=payload.source_id, timestamp=payload.timestamp
+        )
         if is_pass:
             # 被skip的帧也需要释放共享内存
-            payload.release_shared_memory()
+            self.__release_payload(payload)
             logger.debug(f"{payload.source_id} frame is passed!")
             return
 
         # 处理对应的帧
         if self.process.enable_parallel:
-            if self._queue.maxlen == len(self._queue):
+            # 满了会弹出最旧的数据，需要对其共享内存做释放
+            if self._reorder is not None:
+                self._reorder.register(payload.raw_id, payload.source_id)
+            pre_payloads: List[RawPayload] = self._queue.put(
+                payload,
+                key=payload.source_id,
+                weight=self.source_weights[payload.source_id],
+            )
+            self.metrics.crt_queue_bytes(self._queue.nbytes)
+            for pre_payload in pre_payloads:
                 logger.warning(
                     f"{self.__class__.__name__} queue is full! overwrite pre payload"
                 )
                 self.metrics.count_full_drop_frames()
-                # 满了主动pop出数据，为了对共享内存做释放
-                pre_payload: RawPayload = self._queue.popleft()
-                pre_payload.release_shared_memory()
-
-            self._queue.append(payload)
+                if self.process.enable_fair_queue:
+                    self.metrics.count_source_drop_frames(pre_payload.source_id)
+                self.__release_payload(pre_payload)
+                if self._reorder is not None:
+                    self._reorder.done(pre_payload.raw_id, None)
         else:
             self.__sender(self, payload=payload, context=context)
         # display fps
@@ -499,20 +938,59 @@ class CoralNode(MiddlewareCommunicator):
             f"{self.__class__.__name__} receiver fps: {self.receiver_fps} sender fps: {self.sender_fps}"
         )
 
-    def __on_receiver_callback(self, receiver) -> RawPayload:
+    def __on_receiver_callbacks(self, receiver) -> List[RawPayload]:
+        """
+        Receives the payloads of a ready receiver.
+
+        A conflated receiver drains all pending messages and only the newest one of
+        each source is decoded, the superseded ones are dropped before any payload
+        construction and their shared memory is released.
+
+        :param receiver: The receiver callback function.
+        :type receiver: Callable[[Any], Tuple[Optional[Any], ...]]
+
+        :return: The received payloads.
+        :rtype: List[RawPayload]
+        """
+        if not self._poller.is_conflated(receiver):
+            payload = self.__on_receiver_callback(receiver)
+            return [] if payload is None else [payload]
+        messages, superseded = self._poller.recv_latest(receiver)
+        self._drop_superseded_messages(superseded)
+        payloads = [
+            self.__on_receiver_callback(receiver, payload=payload)
+            for payload in messages
+        ]
+        return [payload for payload in payloads if payload is not None]
+
+    def _drop_superseded_messages(self, superseded: List[List[bytes]]):
+        """丢弃被最新帧覆盖的未解码消息, 并释放其共享内存"""
+        for message in superseded:
+            self.metrics.count_conflate_drop_frames()
+            memory_id = shared_memory_id(message)
+            # 未开启共享内存的下游节点同样持有一个引用
+            if memory_id:
+                self.shared_memory_mamager.remove(
+                    memory_id, shared_memory_generation(message)
+                )
+
+    def __on_receiver_callback(self, receiver, payload: Dict = None) -> RawPayload:
         """
         Executes the receiver callback function and returns the result.
 
         :param receiver: The receiver callback function.
         :type receiver: Callable[[Any], Tuple[Optional[Any], ...]]
+        :param payload: The message already received from the receiver, the receiver is called if None.
+        :type payload: Dict
 
         :return: A dictionary containing the topic and the payload.
         :rtype: Dict[str, Any]
         """
-        _payload = receiver(self)
-        if _payload[0] is None:
-            return None
-        payload = _payload[0]
+        if payload is None:
+            _payload = receiver(self)
+            if _payload[0] is None:
+                return None
+            payload = _payload[0]
 
         if payload == DEFAULT_NO_RECEVIER_MSG:
             raw_payload = RawPayload(
@@ -520,17 +998,25 @@ class CoralNode(MiddlewareCommunicator):
                 enable_shared_memory=self.enable_shared_memory,
             )
         else:
-            receiver_wrapper_func = self._MiddlewareCommunicator__registry.get(
-                receiver.__qualname__
-            )
-            communicator = receiver_wrapper_func["communicator"][0]
-            receiver_func_kwargs = communicator["return_func_kwargs"]
-            payload_cls: RawPayload = receiver_func_kwargs["payload_cls"]
-            raw_payload = payload_cls(
-                **payload, enable_shared_memory=self.enable_shared_memory
-            )
+            meta = self._receiver_metas[receiver.__qualname__]
+            if isinstance(payload, RawPayload):
+                # 进程内通道直接传递对象, 无需反序列化
+                raw_payload = payload
+            else:
+                try:
+                    raw_payload = decode_payload(
+                        meta.payload_cls, payload, self.enable_shared_memory
+                    )
+                except CoralSharedMemoryExhaustedException as e:
+                    logger.warning(f"drop frame: {e}")
+                    self.metrics.count_shm_exhausted_drop_frames()
+                    return None
+            self.source_weights[raw_payload.source_id] = meta.weight
+            self._fps_sampler.set_target_fps(raw_payload.source_id, meta.target_fps)
         # 从上一个节点发送到该节点接受耗时
         self.metrics.cost_pendding_frames(time.time() - raw_payload.timestamp)
+        if self._synchronizer is not None and payload != DEFAULT_NO_RECEVIER_MSG:
+            return self.__sync_payload(meta.node_id, raw_payload)
         return raw_payload
 
     def __run_background_senders(self):
@@ -545,30 +1031,292 @@ class CoralNode(MiddlewareCommunicator):
         Returns:
             None
         """
+        if self.process.enable_reorder and self.meta.sender is not None:
+            self.__init_reorder()
+        if self.process.run_mode == RunMode.PROCESS:
+            return self.__run_background_processes()
         # 启动后台处理程序
         for idx in range(self.process.count):
-            # 实例化sender func
-            sender_func = self.__pubsub_func_wrapper(
-                name=f"__lambda_sender_{idx}", func=self.__sender
-            )
-            func = self.__init_sender(self.meta.sender, sender_func)
+            if self._reorder is not None:
+                # 保序模式下由保序缓冲统一发送
+                func = self.__sender
+            else:
+                # 实例化sender func
+                sender_func = self.__pubsub_func_wrapper(
+                    name=f"__lambda_sender_{idx}", func=self.__sender
+                )
+                func = self.__init_sender(self.meta.sender, sender_func)
+            self._process_cls(
+                target=self.__run,
+                args=(func,),
+                name=f"coral_{self.process.run_mode}_{idx}",
+            ).start()
+
+    def __init_publisher(self):
+        """
+        Initialize a sender function that only publishes the given data.
+
+        Returns:
+            Callable: The registered sender function, called as func(self, data=data).
+        """
+        publish_func = self.__pubsub_func_wrapper(
+            name="__lambda_publisher", func=lambda *args, **kwargs: (kwargs["data"],)
+        )
+        return self.__init_sender(self.meta.sender, publish_func)
+
+    def __init_reorder(self):
+        """
+        Initialize the reorder buffer that publishes the frames of every source in receive order.
+
+        Returns:
+            None
+        """
+        func = self.__init_publisher()
+        self._reorder = ReorderBuffer(
+            timeout=self.process.reorder_timeout / 1000,
+            publish=lambda data: func(self, data=data),
+            drop=lambda data: self.__release_dumped_payload(data),
+            metrics=self.metrics,
+        )
+        # 没有新帧完成时, 定时跳过等待超时的空缺
+        self.bg_tasks.add_job(
+            self._reorder.flush_expired,
+            "interval",
+            seconds=self.process.reorder_timeout / 1000,
+        )
+
+    def __release_dumped_payload(self, data: Union[RawPayload, Dict]):
+        """释放已 model_dump 的数据帧的共享内存"""
+        if isinstance(data, RawPayload):
+            data.release_shared_memory()
+            return
+        memory_id = data.get("raw_shared_memory_id")
+        if memory_id:
+            self.shared_memory_mamager.remove(memory_id, data.get("raw_generation"))
+
+    def __run_background_processes(self):
+        """
+        Runs background worker processes.
+
+        The payloads are handed over to the workers by shared memory id through a
+        task queue bounded by the worker count, so the backlog stays in self._queue
+        where the drop policy applies. The workers send the results back the same
+        way and they are published from this process.
+
+        Returns:
+            None
+        """
+        ctx = multiprocessing.get_context("fork")
+        task_queue = ctx.Queue(maxsize=self.process.count * self.process.batch_size)
+        result_queue = ctx.Queue()
+        for idx in range(self.process.count):
             self._process_cls(
-                target=self.__run, args=(func,), name=f"coral_process_{idx}"
+                target=self.__run_process,
+                args=(task_queue, result_queue),
+                name=f"coral_{self.process.run_mode}_{idx}",
+                daemon=True,
             ).start()
 
-    def _record_and_just_is_pass_frame(self, recv_node_id):
+        func = self.__init_publisher() if self._reorder is None else None
+        Thread(
+            target=self.__feed_processes, args=(task_queue,), name="coral_feeder"
+        ).start()
+        Thread(
+            target=self.__publish_process_results,
+            args=(func, result_queue),
+            name="coral_publisher",
+        ).start()
+
+    def __feed_processes(self, task_queue: multiprocessing.Queue):
+        """
+        Moves payloads from the node queue to the worker processes.
+
+        Only the payload class and its model dump are sent, the raw data stays in
+        shared memory and is attached again by the worker.
+        """
+        timeout = self.process.poll_timeout / 1000
+        while self.is_running:
+            payload: RawPayload = self._queue.get(timeout=timeout)
+            if payload is None:
+                continue
+            self.metrics.crt_queue_bytes(self._queue.nbytes)
+            if not self.__drop_expired_payloads([payload]):
+                continue
+            # 子进程与主进程为同一节点, 使用可信格式
+            followers = [
+                (follower.__class__, encode_payload(follower, PayloadFormat.TRUSTED))
+                for follower in self._sync_groups.get(payload.raw_id, [])
+            ]
+            task = (
+                payload.__class__,
+                encode_payload(payload, PayloadFormat.TRUSTED),
+                followers,
+            )
+            while self.is_running:
+                try:
+                    task_queue.put(task, timeout=timeout)
+                    # 同组数据帧由子进程处理和释放
+                    self._sync_groups.pop(payload.raw_id, None)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                self.__release_payload(payload)
+        logger.info("background feeder task check is_running is False, stoped!")
+
+    def __run_process(
+        self, task_queue: multiprocessing.Queue, result_queue: multiprocessing.Queue
+    ):
+        """
+        Runs the worker loop inside a forked process.
+
+        Parameters:
+            task_queue (multiprocessing.Queue): Payload class, dump and the dumps of its sync group to process.
+            result_queue (multiprocessing.Queue): Payload raw_id, sender result, the shared memory ids created by this worker and the costs.
+
+        Returns:
+            None
+        """
+        # mqtt 连接线程不会被 fork 继承, 子进程需要重新建立
+        self.metrics = CoralNodeMetrics(
+            pipeline_id=self.config.pipeline_id,
+            node_id=self.config.node_id,
+            enable=self.config.generic.enable_metrics,
+        )
+        # 继承的共享内存记录归主进程管理
+        self.shared_memory_mamager.handover()
+        # 自适应跳帧由主进程决定, 子进程只回传耗时
+        self._skip_controller = None
+        # 结果以 model_dump 回传, 由主进程发布
+        self._channels = None
+        context = self.__init()
+        parent = multiprocessing.parent_process()
+        while parent.is_alive():
+            tasks = self.__get_process_tasks(task_queue)
+            if not tasks:
+                continue
+            payloads: List[RawPayload] = []
+            for payload_cls, data, followers in tasks:
+                payload = decode_payload(
+                    payload_cls, data, self.enable_shared_memory
+                )
+                if followers:
+                    self._sync_groups[payload.raw_id] = [
+                        decode_payload(
+                            follower_cls, follower, self.enable_shared_memory
+                        )
+                        for follower_cls, follower in followers
+                    ]
+                payloads.append(payload)
+            recv_timestamps = [payload.timestamp for payload in payloads]
+            start_time = time.time()
+            if self.enable_batch:
+                results = self.__send_batch(self.__sender, payloads, context)
+            else:
+                results = [self.__sender(payload=payloads[0], context=context)[0]]
+            crt_time = time.time()
+            process_cost_time = (crt_time - start_time) / len(payloads)
+            for payload, data, recv_timestamp in zip(
+                payloads, results, recv_timestamps
+            ):
+                if self.meta.sender is None:
+                    data = None
+                costs = (process_cost_time, crt_time - recv_timestamp)
+                # 子进程创建的共享内存交由主进程过期清理
+                result_queue.put(
+                    (
+                        payload.raw_id,
+                        data,
+                        self.shared_memory_mamager.handover(),
+                        costs,
+                    )
+                )
+        logger.info("background worker process check parent is not alive, stoped!")
+
+    def __get_process_tasks(self, task_queue: multiprocessing.Queue) -> List[Any]:
+        """
+        Gets the next task, or the next batch of tasks when batching is enabled.
+
+        Parameters:
+            task_queue (multiprocessing.Queue): Payload class, dump and the dumps of its sync group to process.
+
+        Returns:
+            List[Any]: The tasks, empty if no task arrived before the poll timeout.
+        """
+        try:
+            tasks = [task_queue.get(timeout=self.process.poll_timeout / 1000)]
+        except queue.Empty:
+            return []
+        if not self.enable_batch:
+            return tasks
+        deadline = time.time() + self.process.batch_timeout / 1000
+        while len(tasks) < self.process.batch_size:
+            remaining = deadline - time.time()
+            try:
+                if remaining > 0:
+                    tasks.append(task_queue.get(timeout=remaining))
+                else:
+                    tasks.append(task_queue.get_nowait())
+            except queue.Empty:
+                break
+        return tasks
+
+    def __publish_process_results(
+        self, publish_func: Callable, result_queue: multiprocessing.Queue
+    ):
+        """
+        Publishes the results sent back by the worker processes.
+
+        Parameters:
+            publish_func (Callable): The registered sender function, None when the reorder buffer publishes.
+            result_queue (multiprocessing.Queue): Payload raw_id, sender result, the shared memory ids created by the worker and the costs.
+
+        Returns:
+            None
+        """
+        while self.is_running:
+            try:
+                raw_id, data, memory_store, costs = result_queue.get(
+                    timeout=self.process.poll_timeout / 1000
+                )
+            except queue.Empty:
+                continue
+            self.shared_memory_mamager.takeover(memory_store)
+            self._observe_node_cost(*costs)
+            if data is not None:
+                self.sender_times.append(time.time())
+            if self._reorder is not None:
+                self._reorder.done(raw_id, data)
+            elif data is not None:
+                publish_func(self, data=data)
+        logger.info("background publisher task check is_running is False, stoped!")
+
+    def _record_and_just_is_pass_frame(self, recv_node_id, timestamp: float = None):
         """
         A function that records whether a frame is skipped or not and updates the receiver frame count.
 
         Parameters:
             recv_node_id (int): The ID of the receiver node.
+            timestamp (float, optional): The timestamp of the frame, used by the target fps sampling. Defaults to now.
 
         Returns:
             bool: True if the frame is skipped, False otherwise.
         """
         is_pass = False
+        # 按目标帧率采样, 开启后不再按 skip_frame 跳帧
+        enable_fps_sampling = self._fps_sampler.target_fps(recv_node_id) > 0
+        if enable_fps_sampling and self._fps_sampler.is_pass(
+            recv_node_id, time.time() if timestamp is None else timestamp
+        ):
+            is_pass = True
+            self.metrics.count_skip_drop_frames()
+        # 自适应跳帧, 按控制器当前的跳帧比例决定
+        elif self._skip_controller is not None:
+            is_pass = self._skip_controller.is_pass(recv_node_id)
+            if is_pass:
+                self.metrics.count_skip_drop_frames()
         # 记录此帧是否被skip
-        if self.skip_frame_count != 0:
+        elif not enable_fps_sampling and self.skip_frame_count != 0:
             recv_frame_count = self.receiver_frames_count[recv_node_id]
             # 不等于被skip的frame count，则pass掉对应的帧
             if recv_frame_count != self.skip_frame_count:
@@ -588,9 +1336,9 @@ class CoralNode(MiddlewareCommunicator):
     def on_solo_receivers(self):
         """
         Execute the on_solo_receivers function.
-        This function iterates over a list of receivers and calls the __on_receiver_callback
-        method for each receiver. If a payload is returned from the callback, the __on_payload_callback
-        method is called with the payload and the context. This process continues indefinitely
+        This function waits on all receivers through the receiver poller and calls the
+        __on_receiver_callbacks method for each ready receiver. The __on_payload_callback
+        method is called with each returned payload and the context. This process continues indefinitely
         until the program is terminated.
 
         Parameters:
@@ -609,21 +1357,18 @@ class CoralNode(MiddlewareCommunicator):
                 )
                 break
 
-            for receiver in self.receivers:
-                payload = self.__on_receiver_callback(receiver)
-                if payload is None:
-                    continue
-                self.__on_payload_callback(payload, context)
+            for receiver in self._poller.poll():
+                for payload in self.__on_receiver_callbacks(receiver):
+                    self.__on_payload_callback(payload, context)
 
     def on_process_receviers(self):
         """
         Runs the process for all receivers.
 
         This function runs the background senders and then enters an infinite loop.
-        In each iteration of the loop, it iterates over all the receivers and
-        calls the __on_receiver_callback method for each receiver. If the
-        __on_receiver_callback method returns a non-None payload, it calls the
-        __on_payload_callback method with that payload.
+        In each iteration of the loop, it waits on the receiver poller and
+        calls the __on_receiver_callbacks method for each ready receiver, and
+        calls the __on_payload_callback method with each returned payload.
 
         Parameters:
         None
@@ -639,12 +1384,10 @@ class CoralNode(MiddlewareCommunicator):
                 )
                 break
 
-            for receiver in self.receivers:
+            for receiver in self._poller.poll():
                 try:
-                    payload = self.__on_receiver_callback(receiver)
-                    if payload is None:
-                        continue
-                    self.__on_payload_callback(payload)
+                    for payload in self.__on_receiver_callbacks(receiver):
+                        self.__on_payload_callback(payload)
                 except Exception as e:
                     logger.exception(e)
 
@@ -676,6 +1419,47 @@ class CoralNode(MiddlewareCommunicator):
         """
         raise NotImplementedError
 
+    def sender_batch(
+        self, payloads: List[RawPayload], context: Dict[str, Any]
+    ) -> List[ReturnPayload]:
+        """
+        Process a batch of payloads at once, used when process.batch_size is greater than 1.
+
+        The default implementation calls sender for every payload. Override it to run batched inference.
+
+        Args:
+            payloads (List[RawPayload]): The payloads of the batch.
+            context (Dict[str, Any]): The context in which the payloads are sent.
+
+        Returns:
+            List[ReturnPayload]: One result per payload in the same order, None skips the payload.
+        """
+        results = []
+        for payload in payloads:
+            try:
+                results.append(self.sender(payload, context))
+            except CoralSenderIgnoreException:
+                results.append(None)
+        return results
+
+    def sender_group(
+        self, payloads: List[RawPayload], context: Dict[str, Any]
+    ) -> ReturnPayload:
+        """
+        Process a group of time-aligned payloads, used when process.enable_sync is set.
+
+        The result is sent with the raw data of the first payload, the other payloads
+        are released after processing.
+
+        Args:
+            payloads (List[RawPayload]): One payload per receiver, in the order of meta.receivers.
+            context (Dict[str, Any]): The context in which the payloads are sent.
+
+        Raises:
+            NotImplementedError: This method is not implemented and should be overridden in a subclass.
+        """
+        raise NotImplementedError
+
     def shutdown(self):
         self._is_running = False
 
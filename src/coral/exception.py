@@ -10,3 +10,8 @@ class CoralSenderException(CoralException):
 class CoralSenderIgnoreException(CoralSenderException):
     "coral 发送数据忽略的一场"
     pass
+
+
+class CoralSharedMemoryExhaustedException(CoralException):
+    "共享内存槽位池没有空闲槽位, 数据帧被丢弃"
+    pass
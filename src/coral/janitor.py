@@ -0,0 +1,267 @@
+"""
+主机级的共享内存清理
+
+各节点只清理自己创建的共享内存, 节点被强制结束或不再启动时, 其创建的共享内存会一直留在
+/dev/shm 中。清理程序扫描主机上全部 SharedArray 共享内存与各节点的记录日志, 删除没有
+运行中的节点持有的共享内存, 并统计释放的字节数。
+
+可以单独运行, 也可以由节点通过文件锁选举一个节点定时运行:
+    python -m coral.janitor                   # 清理一次并输出统计
+    python -m coral.janitor --interval 60     # 每60秒清理一次
+    python -m coral.janitor --dry-run         # 只统计, 不删除
+"""
+
+import os
+import re
+import time
+import json
+import fcntl
+import argparse
+from typing import Callable, Dict, List, Optional, Set
+
+import SharedArray as sa
+from loguru import logger
+
+from .utils import is_pid_alive
+from .sched import (
+    bg_tasks,
+    refs_lock,
+    read_journal,
+    journal_segments,
+    delete_segments,
+    is_tracked_slot,
+)
+from .constants import (
+    SHARED_DATA_TYPE,
+    SHARED_MEMORY_DIR,
+    SHARED_MEMORY_ID_STORE_DIR,
+    SHARED_MEMORY_CONSUMER_DIR,
+    SHARED_MEMORY_CONSUMER_TTL,
+    SHARED_MEMORY_JOURNAL_TTL,
+    SHARED_MEMORY_JANITOR_LOCK,
+    CORAL_NODE_SHARED_MEMORY_EXPIRE,
+)
+
+# 未记录引用计数的共享内存以 raw_id 命名
+RAW_ID_PATTERN = re.compile(r"^[0-9a-f]{8}$")
+
+
+def is_journal_alive(fp: str, owner: Optional[int]) -> bool:
+    """
+    日志是否仍被运行中的进程持有
+
+    - 节点可能运行在不同的容器中, 进程号不可比较, 以日志的定时刷新为准
+    - 同一容器中进程仍在运行时, 即使日志未及时刷新也视为持有
+    """
+    try:
+        if time.time() - os.stat(fp).st_mtime < SHARED_MEMORY_JOURNAL_TTL:
+            return True
+    except FileNotFoundError:
+        return False
+    return owner is not None and is_pid_alive(owner)
+
+
+class SharedMemoryJanitor:
+    """
+    主机级的共享内存清理
+
+    删除的共享内存:
+    - 记录日志的节点已退出: 日志中记录的全部共享内存与槽位
+    - 槽位池与按帧创建的槽位: 所属的槽位表不在任何运行中节点的日志中
+    - 以 raw_id 命名的共享内存: 不在任何运行中节点的日志中且创建超过 grace 秒
+
+    其他程序创建的共享内存不会被删除。
+    """
+
+    def __init__(self, grace: float = None, dry_run: bool = False):
+        # 刚创建还未写入日志的共享内存(如子进程创建后交由主进程管理), 宽限时间内不删除
+        self.grace = CORAL_NODE_SHARED_MEMORY_EXPIRE * 3 if grace is None else grace
+        self.dry_run = dry_run
+        self._lock_fd: int = None
+
+    def elect(self) -> bool:
+        """
+        Try to become the janitor of the host, the lock is kept until the process exits.
+
+        Returns:
+            bool: Whether this process is the janitor.
+        """
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(SHARED_MEMORY_JANITOR_LOCK, os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        logger.info(f"elected as shared memory janitor, pid: {os.getpid()}")
+        return True
+
+    def run_elected(self, interval: float, report: Callable[[Dict], None] = None):
+        """
+        Sweep every interval seconds while this process is the janitor.
+
+        Every process keeps trying, another one takes over when the janitor exits.
+
+        Args:
+            interval (float): The interval in seconds.
+            report (Callable[[Dict], None], optional): Called with the result of every sweep.
+        """
+
+        def job():
+            if not self.elect():
+                return
+            result = self.sweep()
+            if report is not None:
+                report(result)
+
+        bg_tasks.add_job(job, "interval", seconds=interval)
+
+    def sweep(self) -> Dict:
+        """
+        Delete the shared memory no running node owns.
+
+        Returns:
+            Dict: The number of deleted segments, the bytes they used and the number of
+                removed journals of exited nodes.
+        """
+        live_ids: Set[str] = set()
+        live_slots: Set[str] = set()
+        dead_journals: List[str] = []
+        for name in os.listdir(SHARED_MEMORY_ID_STORE_DIR):
+            if not name.endswith(".journal"):
+                continue
+            fp = os.path.join(SHARED_MEMORY_ID_STORE_DIR, name)
+            try:
+                memory_store, slots, owner = read_journal(fp)
+            except FileNotFoundError:
+                continue
+            if is_journal_alive(fp, owner):
+                live_ids.update(memory_store)
+                live_slots.update(slots)
+            else:
+                dead_journals.append(fp)
+
+        # 扫描全部共享内存耗时较长, 在加锁前完成, 避免阻塞各节点的引用计数
+        orphans = self.__orphans(live_ids, live_slots)
+
+        count, nbytes, journals = 0, 0, 0
+        # 与节点启动时读取日志以及引用计数的释放互斥
+        with refs_lock:
+            for fp in dead_journals:
+                try:
+                    memory_store, slots, owner = read_journal(fp)
+                except FileNotFoundError:
+                    continue
+                # 加锁前节点可能已重新启动并接管日志中的共享内存
+                if is_journal_alive(fp, owner):
+                    live_ids.update(memory_store)
+                    live_slots.update(slots)
+                    continue
+                deleted, size = self.__delete(journal_segments(memory_store, slots))
+                count, nbytes = count + deleted, nbytes + size
+                if not self.dry_run:
+                    os.remove(fp)
+                journals += 1
+            orphans = [
+                memory_id
+                for memory_id in orphans
+                if not self.__is_live(memory_id, live_ids, live_slots)
+            ]
+            deleted, size = self.__delete(orphans)
+            count, nbytes = count + deleted, nbytes + size
+        self.__remove_stale_consumers()
+        result = {"segments": count, "bytes": nbytes, "journals": journals}
+        logger.info(
+            f"shared memory janitor {'found' if self.dry_run else 'reclaimed'}: "
+            f"{count} segments, {nbytes} bytes, {journals} journals of exited nodes"
+        )
+        return result
+
+    @staticmethod
+    def __is_live(memory_id: str, live_ids: Set[str], live_slots: Set[str]) -> bool:
+        """共享内存是否记录在运行中节点的日志中"""
+        if memory_id in live_ids:
+            return True
+        return is_tracked_slot(memory_id) and memory_id.rsplit(".", 1)[0] in live_slots
+
+    def __orphans(self, live_ids: Set[str], live_slots: Set[str]) -> List[str]:
+        """主机上没有运行中的节点持有的 Coral 共享内存"""
+        orphans = []
+        now = time.time()
+        for desc in sa.list():
+            name = desc.name.decode()
+            memory_id = f"{SHARED_DATA_TYPE}{name}"
+            if self.__is_live(memory_id, live_ids, live_slots):
+                continue
+            if not is_tracked_slot(memory_id) and not RAW_ID_PATTERN.match(name):
+                # 其他程序创建的共享内存
+                continue
+            try:
+                mtime = os.stat(os.path.join(SHARED_MEMORY_DIR, name)).st_mtime
+            except FileNotFoundError:
+                continue
+            if now - mtime > self.grace:
+                orphans.append(memory_id)
+        return orphans
+
+    def __delete(self, memory_ids: List[str]):
+        if not self.dry_run:
+            return delete_segments(memory_ids)
+        count, nbytes = 0, 0
+        for memory_id in memory_ids:
+            fp = os.path.join(SHARED_MEMORY_DIR, memory_id[len(SHARED_DATA_TYPE) :])
+            if os.path.exists(fp):
+                count, nbytes = count + 1, nbytes + os.stat(fp).st_size
+        return count, nbytes
+
+    def __remove_stale_consumers(self):
+        """删除已退出的下游节点的注册"""
+        if self.dry_run:
+            return
+        now = time.time()
+        for entry in os.scandir(SHARED_MEMORY_CONSUMER_DIR):
+            if not entry.is_dir():
+                continue
+            for consumer in os.scandir(entry.path):
+                try:
+                    if now - consumer.stat().st_mtime > SHARED_MEMORY_CONSUMER_TTL * 3:
+                        os.remove(consumer.path)
+                except FileNotFoundError:
+                    continue
+            try:
+                os.rmdir(entry.path)
+            except OSError:
+                # 仍有注册的下游节点
+                continue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="host-wide shared memory janitor")
+    parser.add_argument(
+        "--interval", type=float, default=0, help="清理间隔(秒), 0为只清理一次"
+    )
+    parser.add_argument(
+        "--grace",
+        type=float,
+        default=None,
+        help="未记录在日志中的共享内存在创建多少秒后可被删除",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="只统计, 不删除")
+    args = parser.parse_args()
+
+    janitor = SharedMemoryJanitor(grace=args.grace, dry_run=args.dry_run)
+    while True:
+        # 与节点中选举出的清理程序互斥, 只统计时不删除, 无需互斥
+        if args.dry_run or janitor.elect():
+            print(json.dumps(janitor.sweep()), flush=True)
+        else:
+            logger.info("another shared memory janitor is running, skipped")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
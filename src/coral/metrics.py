@@ -59,26 +59,58 @@ class CoralNodeMetrics:
     def count_full_drop_frames(self, value: int = 1):
         return self.system_set("drop_frames_count", value)
 
+    def count_source_drop_frames(self, source_id: str, value: int = 1):
+        return self.system_set("source_drop_frames_count", value, source_id=source_id)
+
     def count_skip_drop_frames(self, value: int = 1):
         return self.system_set("skip_frames_count", value)
 
+    def count_conflate_drop_frames(self, value: int = 1):
+        return self.system_set("conflate_drop_frames_count", value)
+
+    def count_sync_drop_frames(self, value: int = 1):
+        return self.system_set("sync_drop_frames_count", value)
+
+    def count_expired_drop_frames(self, value: int = 1):
+        return self.system_set("expired_frames_count", value)
+
+    def count_shm_exhausted_drop_frames(self, value: int = 1):
+        return self.system_set("shm_exhausted_frames_count", value)
+
+    def count_shm_reclaimed_bytes(self, value: int):
+        return self.system_set("shm_reclaimed_bytes", value)
+
+    def ratio_skip_frames(self, value: float):
+        return self.system_set("skip_frames_ratio", round(value, 4))
+
     def cost_process_frames(self, value: float):
         return self.system_set("process_frames_cost", round(value, 4))
 
     def crt_node_cost(self, value: float):
         return self.system_set("process_node_cost", round(value, 4))
 
+    def crt_queue_bytes(self, value: int):
+        return self.system_set("queue_bytes", value)
+
     def cost_pendding_frames(self, value: float):
         return self.system_set("pendding_frames_cost", round(value, 4))
 
-    def system_set(
-        self,
-        topic: str,
-        value: Union[int, float],
-    ):
+    def count_batch_frames(self, value: int):
+        return self.system_set("batch_frames_count", value)
+
+    def cost_batch_frames(self, value: float):
+        return self.system_set("batch_frames_cost", round(value, 4))
+
+    def cost_reorder_frames(self, value: float):
+        return self.system_set("reorder_frames_cost", round(value, 4))
+
+    def count_gap_skip_frames(self, value: int = 1):
+        return self.system_set("gap_skip_frames_count", value)
+
+    def system_set(self, topic: str, value: Union[int, float], **labels):
         if not self.enable:
             return
-        self.publish(topic, "system", {"value": value})
+        self.publish(topic, "system", {"value": value, **labels})
 
     def business_set(
         self,
@@ -5,12 +5,16 @@ from .parser import XmlParser, JsonParser, Base64Parser
 
 class CoralParser:
     @classmethod
-    def parse(cls, config_path: str, file_type: str) -> Union[XmlParser, JsonParser]:
+    def parse(
+        cls, config_path: str, file_type: str, registry_module: str = None
+    ) -> Union[XmlParser, JsonParser]:
         """
         Parses the given `config_path` and returns an instance of either `XmlParser` or `JsonParser` based on the file type.
 
         Args:
             config_path (str): The path to the configuration file.
+            file_type (str): The type of the configuration file.
+            registry_module (str, optional): Only use the params/return classes defined in this module, defaults to all registered classes.
 
         Returns:
             type[XmlParser] | type[JsonParser]: An instance of `XmlParser` if the file type is XML, or an instance of `JsonParser` if the file type is JSON.
@@ -19,10 +23,10 @@ class CoralParser:
             ValueError: If the file type is unsupported.
         """
         if file_type == "xml":
-            return XmlParser.parse(config_path)
+            return XmlParser.parse(config_path, registry_module)
         elif file_type == "json":
-            return JsonParser.parse(config_path)
+            return JsonParser.parse(config_path, registry_module)
         elif file_type == "base64":
-            return Base64Parser.parse(config_path)
+            return Base64Parser.parse(config_path, registry_module)
         else:
             raise ValueError("Unsupported file type")
@@ -15,12 +15,17 @@ from ..types import (
 
 
 class BaseParse:
-    def __init__(self, data: dict):
-        self.__data = self.__init_data(data)
+    def __init__(self, data: dict, registry_module: str = None):
+        """
+        Parameters:
+            data (dict): The config data.
+            registry_module (str, optional): Only use the params/return classes defined in this module, defaults to all registered classes.
+        """
+        self.__data = self.__init_data(data, registry_module)
         logger.info(f"{self.data.node_id} config data: {self.data}")
 
     @classmethod
-    def parse(cls, config_path: str) -> "BaseParse":
+    def parse(cls, config_path: str, registry_module: str = None) -> "BaseParse":
         raise NotImplementedError
 
     def parse_json_schema(self, node_name: str, node_desc: str, node_type: str):
@@ -127,17 +132,20 @@ class BaseParse:
 
         return result
 
-    def __init_data(self, data) -> ConfigModel:
+    def __init_data(self, data, registry_module: str = None) -> ConfigModel:
         """
         Initializes the data by creating a new instance of the ConfigModel class using the provided data.
 
         Parameters:
             data (Any): The data to be used to initialize the ConfigModel instance.
+            registry_module (str, optional): The module of the params/return classes.
 
         Returns:
             ConfigModel: The newly created ConfigModel instance.
         """
-        return ConfigModel(**data)
+        return ConfigModel.model_validate(
+            data, context={"registry_module": registry_module}
+        )
 
     @property
     def data(self) -> ConfigModel:
@@ -6,7 +6,7 @@ from ._base import BaseParse
 
 class Base64Parser(BaseParse):
     @classmethod
-    def parse(cls, config_path: str):
+    def parse(cls, config_path: str, registry_module: str = None):
         decoded_json = base64.b64decode(config_path)
         data = json.loads(decoded_json)
-        return cls(data)
+        return cls(data, registry_module)
@@ -5,7 +5,7 @@ from ._base import BaseParse
 
 class JsonParser(BaseParse):
     @classmethod
-    def parse(cls, config_path: str):
+    def parse(cls, config_path: str, registry_module: str = None):
         with open(config_path, "r") as f:
             data = json.load(f)
-            return cls(data)
+            return cls(data, registry_module)
@@ -7,7 +7,7 @@ from .pjson import JsonParser
 class XmlParser(BaseParse):
 
     @classmethod
-    def parse(cls, config_path):
+    def parse(cls, config_path, registry_module: str = None):
         with open(config_path, "r") as f:
             data = parse(f.read())
-            return JsonParser.parse(data)
+            return JsonParser.parse(data, registry_module)
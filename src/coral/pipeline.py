@@ -0,0 +1,69 @@
+from threading import Thread
+from typing import List, Tuple, Type
+
+from loguru import logger
+
+from .aio import AsyncCoralNode
+from .coral import CoralNode
+from .channel import ChannelHub
+
+
+class CoralPipeline:
+    """
+    进程内多节点流水线
+
+    - 多个节点运行在同一个进程中, 每个节点一个线程, 使用各自的配置文件
+    - 节点间按 topic 通过进程内有界通道传递 RawPayload 对象, 不经过 wrapyfi/zmq, 也不做序列化
+    - 节点的跳帧、并行、保序、监控指标等配置与单独运行时一致
+    - 每个节点只使用定义在节点类所在模块中的参数类与返参类
+    - 共享内存管理器是进程级单例, 不支持开启共享内存的节点
+    """
+
+    def __init__(self, nodes: List[Tuple[Type[CoralNode], str]]):
+        """
+        Parameters:
+            nodes (List[Tuple[Type[CoralNode], str]]): The node classes and their config files.
+        """
+        self._channels = ChannelHub()
+        self.nodes: List[CoralNode] = []
+        for node_cls, config_path in nodes:
+            if issubclass(node_cls, AsyncCoralNode):
+                raise TypeError(
+                    f"{node_cls.__name__}: CoralPipeline 不支持 AsyncCoralNode"
+                )
+            node = node_cls(
+                config_path=config_path,
+                channels=self._channels,
+                registry_module=node_cls.__module__,
+            )
+            if node.enable_shared_memory:
+                raise ValueError(
+                    f"{node.config.node_id}: CoralPipeline 不支持开启 generic.enable_shared_memory 的节点"
+                )
+            self.nodes.append(node)
+
+    def shutdown(self):
+        for node in self.nodes:
+            node.shutdown()
+
+    def run(self):
+        """
+        Run every node in its own thread until the pipeline is shut down.
+
+        Returns:
+            None
+        """
+        threads = [
+            Thread(target=node.run, name=f"coral_pipeline_{node.config.node_id}")
+            for node in self.nodes
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            logger.info("pipeline interrupted, shutdown all nodes!")
+            self.shutdown()
@@ -0,0 +1,153 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import zmq
+from loguru import logger
+from wrapyfi.connect.wrapper import MiddlewareCommunicator
+
+from .wire import unpack_message
+
+
+# 不解码消息, 直接从 json 文本中提取字段
+SOURCE_ID_PATTERN = re.compile(rb'"source_id"\s*:\s*"([^"]*)"')
+SHARED_MEMORY_ID_PATTERN = re.compile(rb'"raw_shared_memory_id"\s*:\s*"([^"]*)"')
+RAW_GENERATION_PATTERN = re.compile(rb'"raw_generation"\s*:\s*(\d+)')
+
+
+def drain_latest(socket: zmq.Socket) -> Tuple[List[List[bytes]], List[List[bytes]]]:
+    """
+    Receive every pending message of the socket without blocking and keep the newest one per source.
+
+    Args:
+        socket (zmq.Socket): The subscriber socket.
+
+    Returns:
+        Tuple[List[List[bytes]], List[List[bytes]]]: The frames after the topic of
+        the newest message of each source in arrival order, and of the superseded messages.
+    """
+    latest: Dict[bytes, List[bytes]] = {}
+    superseded = []
+    while True:
+        try:
+            frames = socket.recv_multipart(zmq.NOBLOCK)
+        except zmq.Again:
+            break
+        # json 格式的消息或二进制格式的头部
+        message = frames[1:]
+        match = SOURCE_ID_PATTERN.search(message[0])
+        source_id = match.group(1) if match else None
+        previous = latest.pop(source_id, None)
+        if previous is not None:
+            superseded.append(previous)
+        latest[source_id] = message
+    return list(latest.values()), superseded
+
+
+def shared_memory_id(message: List[bytes]) -> Optional[str]:
+    """从未解码的消息中提取共享内存id"""
+    match = SHARED_MEMORY_ID_PATTERN.search(message[0])
+    return match.group(1).decode() if match else None
+
+
+def shared_memory_generation(message: List[bytes]) -> Optional[int]:
+    """从未解码的消息中提取共享内存槽位的分配次数"""
+    match = RAW_GENERATION_PATTERN.search(message[0])
+    return int(match.group(1)) if match else None
+
+
+class ReceiverPoller:
+    """
+    多接收者事件驱动轮询器
+
+    - 所有 zeromq receiver 的 socket 注册到同一个 zmq.Poller, 无数据时阻塞等待
+    - 任意 socket 可读时立即唤醒, 只返回可读的 receiver
+    - 无法获取 socket 的 receiver (默认 receiver 或其他中间件) 每轮都直接返回, 保持原有行为
+    - 开启 conflate 的 receiver 由 recv_latest 一次取出所有待处理消息, 每个数据源只解码最新的一条
+    """
+
+    def __init__(self, receivers: List[Callable], timeout: int):
+        # 单位: 毫秒, 超时后返回空列表, 用于上层检查节点运行状态
+        self._timeout = timeout
+        self._poller = zmq.Poller()
+        self._sockets: Dict[zmq.Socket, Callable] = {}
+        # 尚未绑定 socket 的 receiver, listener 在首次调用时才会被 wrapyfi 实例化
+        self._pending = list(receivers)
+
+    @staticmethod
+    def _receiver_communicator(receiver: Callable) -> Dict:
+        registry = MiddlewareCommunicator._MiddlewareCommunicator__registry
+        receiver_wrapper_func = registry.get(receiver.__qualname__)
+        if not receiver_wrapper_func:
+            return {}
+        return receiver_wrapper_func["communicator"][0]
+
+    @classmethod
+    def _receiver_socket(cls, receiver: Callable) -> zmq.Socket:
+        """获取 receiver 对应 wrapyfi listener 的 zmq socket"""
+        listener = cls._receiver_communicator(receiver).get("wrapped_executor")
+        socket = getattr(listener, "_socket", None)
+        if isinstance(socket, zmq.Socket):
+            return socket
+        return None
+
+    def is_conflated(self, receiver: Callable) -> bool:
+        """receiver 已绑定 socket 且开启了 conflate"""
+        if receiver not in self._sockets.values():
+            return False
+        communicator = self._receiver_communicator(receiver)
+        return bool(communicator.get("return_func_kwargs", {}).get("conflate"))
+
+    def recv_latest(self, receiver: Callable) -> Tuple[List[Any], List[List[bytes]]]:
+        """
+        Receive every pending message of a conflated receiver and decode only the newest one per source.
+
+        Args:
+            receiver (Callable): A receiver for which is_conflated is True.
+
+        Returns:
+            Tuple[List[Any], List[List[bytes]]]: The decoded newest messages, and the
+            superseded messages which are never decoded.
+        """
+        listener = self._receiver_communicator(receiver)["wrapped_executor"]
+        latest, superseded = drain_latest(listener._socket)
+        messages = [
+            unpack_message(
+                message,
+                object_hook=listener._plugin_decoder_hook,
+                **listener._deserializer_kwargs,
+            )
+            for message in latest
+        ]
+        return messages, superseded
+
+    def _bind_pending(self):
+        for receiver in self._pending.copy():
+            socket = self._receiver_socket(receiver)
+            if socket is None:
+                continue
+            self._poller.register(socket, zmq.POLLIN)
+            self._sockets[socket] = receiver
+            self._pending.remove(receiver)
+            logger.info(f"receiver poller register socket: {receiver.__qualname__}")
+
+    def poll(self) -> List[Callable]:
+        """
+        Wait until at least one receiver has a message ready.
+
+        Returns:
+            List[Callable]: The receivers that are ready to be called. Receivers
+            without a pollable socket are always included.
+        """
+        if self._pending:
+            self._bind_pending()
+        if not self._sockets:
+            return self._pending
+        # 存在无法轮询的 receiver 时不能阻塞, 否则会饿死这些 receiver
+        timeout = 0 if self._pending else self._timeout
+        events = dict(self._poller.poll(timeout))
+        ready = [
+            receiver
+            for socket, receiver in self._sockets.items()
+            if events.get(socket, 0) & zmq.POLLIN
+        ]
+        return ready + self._pending
@@ -0,0 +1,216 @@
+import time
+from collections import deque
+from threading import Condition
+from typing import Any, Callable, Dict, List, Optional
+
+
+class PayloadQueue:
+    """
+    有界阻塞的数据帧队列
+
+    - put 永不阻塞, 队列满时丢弃最旧的数据帧并返回, 由调用方释放共享内存
+    - 设置 max_bytes 时按 sizeof 估算的总字节数限制, 超出时同样丢弃最旧的数据帧, 至少保留最新的一帧
+    - get 在队列为空时阻塞, 有数据入队时立即唤醒一个等待的消费者
+    - get_batch 按批取出, 用于批量推理
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        max_bytes: int = 0,
+        sizeof: Callable[[Any], int] = None,
+    ):
+        self._maxsize = maxsize
+        # 0为不限制字节数
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda item: 0)
+        self._nbytes = 0
+        self._items = deque()
+        self._not_empty = Condition()
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def nbytes(self) -> int:
+        """队列中数据帧的估算总字节数"""
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._items)
+
+    def full(self) -> bool:
+        return len(self._items) >= self._maxsize
+
+    def _append(self, item: Any, key: str, weight: int) -> Optional[Any]:
+        dropped = None
+        if len(self._items) >= self._maxsize:
+            dropped = self._items.popleft()
+        self._items.append(item)
+        return dropped
+
+    def _evict(self) -> Any:
+        """超出字节预算时丢弃的数据帧"""
+        return self._items.popleft()
+
+    def _popleft(self) -> Any:
+        return self._items.popleft()
+
+    def _take(self) -> Any:
+        item = self._popleft()
+        self._nbytes -= self._sizeof(item)
+        return item
+
+    def put(self, item: Any, key: str = None, weight: int = 1) -> List[Any]:
+        """
+        Append an item, dropping the oldest ones when the queue is full or over its byte budget.
+
+        Args:
+            item (Any): The item to enqueue.
+            key (str, optional): The source of the item, used by keyed queues.
+            weight (int, optional): The scheduling weight of the source, used by keyed queues.
+
+        Returns:
+            List[Any]: The dropped items, empty if nothing was dropped.
+        """
+        with self._not_empty:
+            self._nbytes += self._sizeof(item)
+            dropped = self._append(item, key, weight)
+            dropped = [] if dropped is None else [dropped]
+            if dropped:
+                self._nbytes -= self._sizeof(dropped[0])
+            while self._max_bytes and self._nbytes > self._max_bytes and len(self) > 1:
+                dropped.append(self._evict())
+                self._nbytes -= self._sizeof(dropped[-1])
+            self._not_empty.notify()
+        return dropped
+
+    def get(self, timeout: float = None) -> Optional[Any]:
+        """
+        Remove and return the oldest item, waiting until one is available.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. Waits forever if None.
+
+        Returns:
+            Optional[Any]: The oldest item, or None if the timeout elapsed.
+        """
+        with self._not_empty:
+            if not len(self) and not self._not_empty.wait_for(
+                lambda: len(self), timeout
+            ):
+                return None
+            return self._take()
+
+    def get_batch(self, size: int, wait: float, timeout: float = None) -> List[Any]:
+        """
+        Remove and return up to size items as one batch.
+
+        Args:
+            size (int): Maximum number of items in the batch.
+            wait (float): Maximum seconds to wait for the batch to fill once the first item arrived.
+            timeout (float, optional): Maximum seconds to wait for the first item. Waits forever if None.
+
+        Returns:
+            List[Any]: The batch, empty if the timeout elapsed.
+        """
+        with self._not_empty:
+            if not len(self) and not self._not_empty.wait_for(
+                lambda: len(self), timeout
+            ):
+                return []
+            deadline = time.monotonic() + wait
+            batch = []
+            while len(batch) < size:
+                if len(self):
+                    batch.append(self._take())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._not_empty.wait(remaining):
+                    break
+            return batch
+
+
+class FairPayloadQueue(PayloadQueue):
+    """
+    按数据源分队列的数据帧队列
+
+    - 每个 key(source_id) 独立限长, 满时只丢弃该数据源最旧的帧, 突发的数据源不会挤占其他数据源
+    - 出队时按各数据源的权重做平滑加权轮询
+    - 超出字节预算时丢弃积压最多的数据源最旧的帧
+    - 队列为空且超过 idle_timeout 秒没有新帧的数据源被移除, 数据源频繁变化时状态不会无限增长
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        max_bytes: int = 0,
+        sizeof: Callable[[Any], int] = None,
+        idle_timeout: float = 60,
+    ):
+        super().__init__(maxsize, max_bytes=max_bytes, sizeof=sizeof)
+        self._queues: Dict[str, deque] = {}
+        self._weights: Dict[str, int] = {}
+        self._current_weights: Dict[str, int] = {}
+        # 各数据源最近一次入队的时间
+        self._active_at: Dict[str, float] = {}
+        self._idle_timeout = idle_timeout
+        self._size = 0
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._queues)
+
+    def __len__(self):
+        return self._size
+
+    def full(self) -> bool:
+        return any(len(items) >= self._maxsize for items in self._queues.values())
+
+    def _append(self, item: Any, key: str, weight: int) -> Optional[Any]:
+        if key not in self._queues:
+            self._queues[key] = deque()
+            self._current_weights[key] = 0
+        self._weights[key] = max(weight, 1)
+        self._active_at[key] = time.monotonic()
+        items = self._queues[key]
+        dropped = None
+        if len(items) >= self._maxsize:
+            dropped = items.popleft()
+        else:
+            self._size += 1
+        items.append(item)
+        return dropped
+
+    def _evict(self) -> Any:
+        items = max(self._queues.values(), key=len)
+        self._size -= 1
+        return items.popleft()
+
+    def _popleft(self) -> Any:
+        # 平滑加权轮询: 非空队列累加权重, 选出当前权重最大的队列后减去总权重
+        total, selected = 0, None
+        now, idle = time.monotonic(), []
+        for key, items in self._queues.items():
+            if not items:
+                if now - self._active_at[key] > self._idle_timeout:
+                    idle.append(key)
+                continue
+            self._current_weights[key] += self._weights[key]
+            total += self._weights[key]
+            if selected is None or (
+                self._current_weights[key] > self._current_weights[selected]
+            ):
+                selected = key
+        self._current_weights[selected] -= total
+        self._size -= 1
+        for key in idle:
+            self.__remove(key)
+        return self._queues[selected].popleft()
+
+    def __remove(self, key: str):
+        del self._queues[key]
+        del self._weights[key]
+        del self._current_weights[key]
+        del self._active_at[key]
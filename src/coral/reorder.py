@@ -0,0 +1,97 @@
+import time
+from threading import Lock
+from collections import defaultdict
+from typing import Any, Callable, Dict, Tuple
+
+from loguru import logger
+
+from .metrics import CoralNodeMetrics
+
+
+class ReorderBuffer:
+    """
+    按 source_id 保序的发送缓冲
+
+    - 接收时按 source_id 分配递增序号
+    - 处理完成的帧按序号顺序发送, 前序帧未完成时暂存
+    - 暂存的帧等待超过 timeout 秒后跳过前序空缺, 之后到达的迟到帧直接丢弃
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        publish: Callable[[Any], None],
+        drop: Callable[[Any], None],
+        metrics: CoralNodeMetrics,
+    ):
+        self._timeout = timeout
+        self._publish = publish
+        self._drop = drop
+        self._metrics = metrics
+        self._lock = Lock()
+        # raw_id -> (source_id, 序号)
+        self._sequences: Dict[str, Tuple[str, int]] = {}
+        self._next_seq = defaultdict(int)
+        self._expected = defaultdict(int)
+        # source_id -> {序号: (发送数据, 完成时间)}
+        self._pending: Dict[str, Dict[int, Tuple[Any, float]]] = defaultdict(dict)
+
+    def register(self, raw_id: str, source_id: str):
+        """接收时登记数据帧, 分配序号"""
+        with self._lock:
+            seq = self._next_seq[source_id]
+            self._next_seq[source_id] = seq + 1
+            self._sequences[raw_id] = (source_id, seq)
+
+    def done(self, raw_id: str, data: Any):
+        """
+        Mark a registered frame as processed and publish every frame that is now in order.
+
+        Args:
+            raw_id (str): The raw_id of the payload.
+            data (Any): The data to publish, None if the frame was dropped or ignored.
+        """
+        with self._lock:
+            item = self._sequences.pop(raw_id, None)
+            if item is None:
+                logger.warning(f"reorder buffer not found frame: {raw_id}, publish directly")
+                if data is not None:
+                    self._publish(data)
+                return
+            source_id, seq = item
+            if seq < self._expected[source_id]:
+                logger.warning(f"reorder buffer drop late frame: {source_id} {seq}")
+                if data is not None:
+                    self._drop(data)
+                return
+            self._pending[source_id][seq] = (data, time.time())
+            self._flush(source_id)
+
+    def flush_expired(self):
+        """跳过等待超时的空缺, 由定时任务调用"""
+        with self._lock:
+            for source_id in list(self._pending):
+                self._flush(source_id)
+
+    def _flush(self, source_id: str):
+        pending = self._pending[source_id]
+        expected = self._expected[source_id]
+        while pending:
+            if expected in pending:
+                data, done_time = pending.pop(expected)
+                expected += 1
+                if data is not None:
+                    self._metrics.cost_reorder_frames(time.time() - done_time)
+                    self._publish(data)
+                continue
+            # 前序帧未完成, 最早完成的帧等待超时后跳过空缺
+            oldest = min(done_time for _, done_time in pending.values())
+            if time.time() - oldest < self._timeout:
+                break
+            next_seq = min(pending)
+            logger.warning(
+                f"reorder buffer skip gap: {source_id} {expected} -> {next_seq}"
+            )
+            self._metrics.count_gap_skip_frames(next_seq - expected)
+            expected = next_seq
+        self._expected[source_id] = expected
@@ -0,0 +1,60 @@
+from threading import Lock
+from collections import defaultdict
+
+
+class FpsSampler:
+    """
+    按目标帧率对各数据源采样
+
+    - 按数据帧的时间戳间隔准入, 与数据源本身的帧率无关
+    - 各数据源独立计时, 目标帧率可按数据源设置, 0为不采样
+    """
+
+    # 时间戳抖动的容忍比例, 避免帧间隔略小于目标间隔时被连续丢弃
+    TOLERANCE = 0.1
+
+    def __init__(self, target_fps: float = 0):
+        self._target_fps = target_fps
+        self._lock = Lock()
+        self._source_fps = {}
+        # source_id -> 下一帧允许的最早时间戳
+        self._next_times = defaultdict(float)
+
+    def set_target_fps(self, source_id: str, target_fps: float):
+        """设置数据源的目标帧率, None 表示使用全局目标帧率"""
+        if target_fps is not None:
+            self._source_fps[source_id] = target_fps
+
+    def target_fps(self, source_id: str) -> float:
+        return self._source_fps.get(source_id, self._target_fps)
+
+    def is_pass(self, source_id: str, timestamp: float) -> bool:
+        """
+        Decide whether the frame of the source is dropped by the target fps.
+
+        Args:
+            source_id (str): The source of the frame.
+            timestamp (float): The timestamp of the frame.
+
+        Returns:
+            bool: True if the frame is dropped, False otherwise.
+        """
+        target_fps = self.target_fps(source_id)
+        if target_fps <= 0:
+            return False
+        interval = 1 / target_fps
+        with self._lock:
+            next_time = self._next_times[source_id]
+            # 时间戳回退超过一个间隔时视为数据源重启, 不丢弃
+            if (
+                next_time - 2 * interval
+                <= timestamp
+                < next_time - interval * self.TOLERANCE
+            ):
+                return True
+            # 按固定间隔推进, 长时间无帧或时间戳回退时从当前帧重新计时
+            next_time += interval
+            if not timestamp - interval < next_time <= timestamp + interval:
+                next_time = timestamp + interval
+            self._next_times[source_id] = next_time
+            return False
@@ -2,6 +2,10 @@ import atexit
 import os
 import time
 import json
+import heapq
+import fcntl
+import threading
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import SharedArray as sa
@@ -9,7 +13,20 @@ from loguru import logger
 from wrapyfi.utils import SingletonOptimized
 from apscheduler.schedulers.background import BackgroundScheduler
 
-from .constants import SHARED_MEMORY_ID_STORE_DIR
+from .utils import generate_short_uid, is_pid_alive
+from .exception import CoralSharedMemoryExhaustedException
+from .constants import (
+    SHARED_DATA_TYPE,
+    SHARED_MEMORY_ID_STORE_DIR,
+    SHARED_MEMORY_POOL_PREFIX,
+    SHARED_MEMORY_FRAMES_PREFIX,
+    SHARED_MEMORY_FRAMES_SIZE,
+    SHARED_MEMORY_CONSUMER_DIR,
+    SHARED_MEMORY_CONSUMER_TTL,
+    SHARED_MEMORY_JOURNAL_TTL,
+    SHARED_MEMORY_DIR,
+    DELETE_SHARED_MEMORY_LOCK,
+)
 
 
 # 启动定时器线程
@@ -18,23 +35,302 @@ bg_tasks.start()
 atexit.register(bg_tasks.shutdown)
 
 
+POOL_PREFIX = f"{SHARED_DATA_TYPE}{SHARED_MEMORY_POOL_PREFIX}"
+FRAMES_PREFIX = f"{SHARED_DATA_TYPE}{SHARED_MEMORY_FRAMES_PREFIX}"
+
+
+def is_pool_slot(memory_id: str) -> bool:
+    return memory_id.startswith(POOL_PREFIX)
+
+
+def is_tracked_slot(memory_id: str) -> bool:
+    """槽位池或按帧创建的带引用计数的共享内存"""
+    return memory_id.startswith((POOL_PREFIX, FRAMES_PREFIX))
+
+
+def slot_id(slots_id: str, idx: int) -> str:
+    return f"{slots_id}.{idx}"
+
+
+def refs_id(slots_id: str) -> str:
+    return f"{slots_id}.refs"
+
+
+class RefsLock:
+    """
+    引用计数的跨进程锁, 同一主机上的所有节点共用一个锁文件
+
+    - 同一进程内的线程共用文件描述符, 需先获取线程锁
+    - fork 的子进程与父进程共用打开的文件, 需重新打开
+    - fork 时父进程的其他线程可能正持有线程锁, 子进程中需重新创建, 否则会死锁
+    """
+
+    def __init__(self, fp: str):
+        self._fp = fp
+        self._fd = None
+        self._pid = None
+        self._thread_lock = threading.Lock()
+        os.register_at_fork(after_in_child=self.__reset_after_fork)
+
+    def __reset_after_fork(self):
+        self._thread_lock = threading.Lock()
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._pid != os.getpid():
+            self._fd = os.open(self._fp, os.O_RDWR | os.O_CREAT)
+            self._pid = os.getpid()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *args):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+
+refs_lock = RefsLock(DELETE_SHARED_MEMORY_LOCK)
+
+
+class SharedMemorySlots:
+    """
+    带引用计数的一组共享内存槽位
+
+    - 引用计数保存在单独的共享内存中, 任意进程可通过槽位ID增减, 归零时释放槽位
+    - 只由创建的进程分配槽位, 分配时引用计数为1, 即创建者持有的引用
+    - 每个槽位记录分配次数, 同一槽位ID被复用后可据此判断数据是否已被覆盖
+    """
+
+    def __init__(self, slots_id: str, size: int):
+        self.slots_id = slots_id
+        self.size = size
+        # 每行为: 引用计数, 分配次数
+        self.table = sa.create(refs_id(slots_id), (size, 2), np.int64)
+        self.refs = self.table[:, 0]
+        self.generations = self.table[:, 1]
+        self._acquired_at = [0.0] * size
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _take(self) -> Optional[int]:
+        """按顺序分配下一个空闲槽位, 没有空闲槽位时返回 None"""
+        with self._lock:
+            # 从上次分配的位置继续, 刚释放的槽位最晚被复用
+            idx = self._next % self.size
+            if self.refs[idx] != 0:
+                free = np.flatnonzero(self.refs == 0)
+                if not free.size:
+                    return None
+                later = free[free >= idx]
+                idx = int(later[0] if later.size else free[0])
+            # 引用计数为0的槽位只有创建者会修改, 无需跨进程锁
+            self.refs[idx] = 1
+            self.generations[idx] += 1
+            self._acquired_at[idx] = time.time()
+            self._next = idx + 1
+        return idx
+
+    @staticmethod
+    def free(memory_id: str):
+        """引用计数归零时释放槽位, 在 refs_lock 中调用"""
+        raise NotImplementedError
+
+    def reclaim_expired(self, expire: float) -> int:
+        """回收超过 expire 秒仍未被全部释放的槽位"""
+        count = 0
+        now = time.time()
+        with refs_lock:
+            for idx in np.flatnonzero(self.refs > 0):
+                if now - self._acquired_at[idx] > expire:
+                    self.free(slot_id(self.slots_id, idx))
+                    self.refs[idx] = 0
+                    count += 1
+        return count
+
+    def destroy(self):
+        try:
+            sa.delete(refs_id(self.slots_id))
+        except FileNotFoundError:
+            logger.warning(f"not found memory id: {refs_id(self.slots_id)} info")
+        logger.info(f"destroy shared memory slots: {self.slots_id}")
+
+
+class SharedMemoryPool(SharedMemorySlots):
+    """
+    固定 shape 的共享内存槽位池
+
+    - 槽位在创建池时一次性分配并写入, 之后不再创建/删除共享内存文件, 也不再产生缺页
+    - 引用计数归零时槽位不删除, 由创建池的进程复用
+    """
+
+    def __init__(self, slots_id: str, shape: tuple, dtype: np.dtype, size: int):
+        super().__init__(slots_id, size)
+        self.slots = []
+        for idx in range(size):
+            slot = sa.create(slot_id(slots_id, idx), shape, dtype)
+            # 预先写入, 使缺页发生在创建时
+            slot.fill(0)
+            self.slots.append(slot)
+        logger.info(f"create shared memory pool: {slots_id} {shape} {dtype} size: {size}")
+
+    def acquire(self) -> Optional[Tuple[str, np.ndarray]]:
+        idx = self._take()
+        if idx is None:
+            return None
+        return slot_id(self.slots_id, idx), self.slots[idx]
+
+    @staticmethod
+    def free(memory_id: str):
+        # 槽位在池销毁前一直保留, 引用计数归零后直接复用
+        pass
+
+    def destroy(self):
+        for idx in range(self.size):
+            try:
+                sa.delete(slot_id(self.slots_id, idx))
+            except FileNotFoundError:
+                logger.warning(f"not found memory id: {slot_id(self.slots_id, idx)} info")
+        super().destroy()
+
+
+class SharedMemoryFrames(SharedMemorySlots):
+    """
+    按帧创建的共享内存, 引用计数归零时删除
+    """
+
+    def acquire(self, shape: tuple, dtype: np.dtype) -> Optional[Tuple[str, np.ndarray]]:
+        idx = self._take()
+        if idx is None:
+            return None
+        memory_id = slot_id(self.slots_id, idx)
+        try:
+            return memory_id, sa.create(memory_id, shape, dtype)
+        except Exception:
+            self.refs[idx] = 0
+            raise
+
+    @staticmethod
+    def free(memory_id: str):
+        try:
+            sa.delete(memory_id)
+        except FileNotFoundError:
+            logger.warning(f"not found memory id: {memory_id} info")
+
+    def destroy(self):
+        with refs_lock:
+            for idx in np.flatnonzero(self.refs > 0):
+                self.free(slot_id(self.slots_id, idx))
+                self.refs[idx] = 0
+        super().destroy()
+
+
+def read_journal(fp: str) -> Tuple[Dict[str, float], Dict[str, int], Optional[int]]:
+    """
+    Replay a shared memory journal of a SharedMemoryIDManager.
+
+    Args:
+        fp (str): The journal file.
+
+    Returns:
+        Tuple[Dict[str, float], Dict[str, int], Optional[int]]: The recorded memory ids
+            with their create time, the slot tables with their size and the pid of the
+            process writing the journal.
+    """
+    memory_store, slots, owner = {}, {}, None
+    with open(fp, "r") as f:
+        for line in f:
+            # 进程被强制结束时最后一行可能不完整
+            op, *args = line.split() or [None]
+            try:
+                if op == "pid":
+                    owner = int(args[0])
+                elif op == "+":
+                    memory_store[args[0]] = float(args[1])
+                elif op == "-":
+                    memory_store.pop(args[0], None)
+                elif op == "s":
+                    slots[args[0]] = int(args[1])
+                elif op == "x":
+                    slots.pop(args[0], None)
+            except (IndexError, ValueError):
+                logger.warning(f"skip shared memory journal line: {line!r}")
+    return memory_store, slots, owner
+
+
+def journal_segments(memory_store: Dict[str, float], slots: Dict[str, int]) -> List[str]:
+    """日志中记录的全部共享内存ID, 包括槽位表的槽位与引用计数"""
+    memory_ids = list(memory_store)
+    for slots_id, size in slots.items():
+        memory_ids += [slot_id(slots_id, idx) for idx in range(size)]
+        memory_ids.append(refs_id(slots_id))
+    return memory_ids
+
+
+def delete_segments(memory_ids: List[str]) -> Tuple[int, int]:
+    """
+    Delete the shared memory, the missing ones are skipped.
+
+    Args:
+        memory_ids (List[str]): The memory ids.
+
+    Returns:
+        Tuple[int, int]: The number of deleted segments and the bytes they used.
+    """
+    count, nbytes = 0, 0
+    for memory_id in memory_ids:
+        fp = os.path.join(SHARED_MEMORY_DIR, memory_id[len(SHARED_DATA_TYPE) :])
+        try:
+            size = os.stat(fp).st_size
+            sa.delete(memory_id)
+        except FileNotFoundError:
+            continue
+        count += 1
+        nbytes += size
+    return count, nbytes
+
+
 class SharedMemoryIDManager(metaclass=SingletonOptimized):
     """共享内存管理模块"""
 
-    def __init__(self, manager_id: str, expire: int):
+    def __init__(self, manager_id: str, expire: int, pool_size: int = 0):
         # 默认 expire 秒在整个链路中要处理完, 否则会内存数据会被 expire * 1.5 秒后定时清除
         self._expire = expire
         self._memory_store = dict()
+        # (创建时间, 共享内存ID) 的最小堆, 过期清理只检查堆顶, 已释放的记录出堆时跳过
+        self._expiry: List[Tuple[float, str]] = []
+        # 每种 shape 的槽位数, 0 为不使用槽位池, 每帧创建与删除共享内存
+        self._pool_size = pool_size
+        self._pools: Dict[Tuple[tuple, str], SharedMemoryPool] = {}
+        self._frames: SharedMemoryFrames = None
+        # 只在创建管理器的进程中分配槽位, 避免多个进程分配同一槽位
+        self._slots_pid = os.getpid()
+        self._slots_lock = threading.Lock()
+        # 已 attach 的引用计数表, 用于增减其他进程创建的槽位的引用
+        self._tables: Dict[str, np.ndarray] = {}
+        # topic -> (下游节点数, 统计时间)
+        self._consumers: Dict[str, Tuple[int, float]] = {}
+        # 追加写入的日志, 进程被强制结束时仍保留创建的共享内存记录
+        self._journal_fd: int = None
+        self._journal_lines = 0
+        self._journal_lock = threading.Lock()
         self.__init_mamager(manager_id)
 
     def __init_mamager(self, mamager_id):
         self.manager_id = mamager_id
-        self._fp = os.path.join(SHARED_MEMORY_ID_STORE_DIR, f"{self.manager_id}.json")
+        self._fp = os.path.join(
+            SHARED_MEMORY_ID_STORE_DIR, f"{self.manager_id}.journal"
+        )
+        # 旧版本在退出时写入的记录
+        self._legacy_fp = os.path.join(
+            SHARED_MEMORY_ID_STORE_DIR, f"{self.manager_id}.json"
+        )
         self.__load_and_flush()
+        bg_tasks.add_job(
+            self.__touch_journal, "interval", seconds=SHARED_MEMORY_JOURNAL_TTL / 3
+        )
         # 此处默认启动定时器, expire * 3的轮询时间删除过期的内存, 内存保留 expire时间
         self.interval_flush(self._expire * 1.5)
         # 注册停止操作
         atexit.register(self.dump)
+        atexit.register(self.destroy_slots)
 
     def attach(self, memory_id):
         # attach memory时不更新 memory_store，因为memory的产生不一定是在当前节点
@@ -44,22 +340,281 @@ class SharedMemoryIDManager(metaclass=SingletonOptimized):
 
     def add(self, memory_id: str, shape: tuple, dtype: np.dtype):
         memory_data = sa.create(memory_id, shape, dtype)
-        self._memory_store.update({memory_id: time.time()})
+        self.__track(memory_id, time.time())
         logger.debug(f"create shared memory: {memory_id}")
         return memory_data
 
-    def remove(self, memory_id):
+    def __track(self, memory_id: str, timestamp: float):
+        self._memory_store[memory_id] = timestamp
+        heapq.heappush(self._expiry, (timestamp, memory_id))
+        self.__journal(f"+ {memory_id} {timestamp}")
+
+    def acquire(self, memory_id: str, shape: tuple, dtype: np.dtype):
+        """
+        Create the shared memory of a frame with a reference held by the creator.
+
+        The memory comes from the slot pool when it is enabled, otherwise it is created
+        for the frame and deleted when the last reference is released.
+
+        Args:
+            memory_id (str): The id used when the memory is not reference counted.
+            shape (tuple): The shape of the data.
+            dtype (np.dtype): The dtype of the data.
+
+        Raises:
+            CoralSharedMemoryExhaustedException: No free slot in the pool.
+
+        Returns:
+            Tuple[str, np.ndarray]: The memory id and the shared memory data.
+        """
+        # 子进程中仍按帧创建, 交由主进程过期清理
+        if self._slots_pid != os.getpid():
+            return memory_id, self.add(memory_id, shape, dtype)
+        if self._pool_size > 0:
+            pool = self.__pool(shape, dtype)
+            slot = pool.acquire()
+            if slot is None:
+                raise CoralSharedMemoryExhaustedException(
+                    f"共享内存槽位池 {pool.slots_id} 的 {pool.size} 个槽位均未被释放"
+                )
+        else:
+            frames = self.__frames_slots()
+            slot = frames.acquire(shape, dtype)
+            if slot is None:
+                logger.warning(
+                    f"{frames.slots_id} 的 {frames.size} 个共享内存均未被释放, 不再记录引用计数"
+                )
+                return memory_id, self.add(memory_id, shape, dtype)
+        logger.debug(f"acquire shared memory slot: {slot[0]}")
+        return slot
+
+    def __new_slots_id(self, prefix: str) -> str:
+        return f"{SHARED_DATA_TYPE}{prefix}{self.manager_id}-{generate_short_uid()}"
+
+    def __pool(self, shape: tuple, dtype: np.dtype) -> SharedMemoryPool:
+        key = (tuple(shape), np.dtype(dtype).str)
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._slots_lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    pool = SharedMemoryPool(
+                        self.__new_slots_id(SHARED_MEMORY_POOL_PREFIX),
+                        shape,
+                        dtype,
+                        self._pool_size,
+                    )
+                    self._pools[key] = pool
+                    self.__journal(f"s {pool.slots_id} {pool.size}")
+        return pool
+
+    def __frames_slots(self) -> SharedMemoryFrames:
+        if self._frames is None:
+            with self._slots_lock:
+                if self._frames is None:
+                    self._frames = SharedMemoryFrames(
+                        self.__new_slots_id(SHARED_MEMORY_FRAMES_PREFIX),
+                        SHARED_MEMORY_FRAMES_SIZE,
+                    )
+                    self.__journal(f"s {self._frames.slots_id} {self._frames.size}")
+        return self._frames
+
+    def __slot_table(self, memory_id: str) -> Tuple[Optional[np.ndarray], int]:
+        slots_id, idx = memory_id.rsplit(".", 1)
+        table = self._tables.get(slots_id)
+        if table is None:
+            try:
+                table = self._tables[slots_id] = sa.attach(refs_id(slots_id))
+            except FileNotFoundError:
+                logger.warning(f"not found shared memory refs: {slots_id} info")
+        return table, int(idx)
+
+    def generation(self, memory_id: str) -> Optional[int]:
+        """
+        Return how many times the slot of the memory id has been acquired.
+
+        A payload keeps the generation it saw, a different value later means the slot
+        was reclaimed and reused by another frame.
+
+        Args:
+            memory_id (str): The memory id.
+
+        Returns:
+            Optional[int]: The generation, None when the memory is not reference counted.
+        """
+        if not is_tracked_slot(memory_id):
+            return None
+        table, idx = self.__slot_table(memory_id)
+        return None if table is None else int(table[idx, 1])
+
+    def share(self, memory_id: str, consumers: int, generation: int = None):
+        """
+        Hand the reference held by this node to the downstream consumers.
+
+        Args:
+            memory_id (str): The memory id of the frame to send.
+            consumers (int): The number of downstream consumers.
+            generation (int, optional): The generation of the slot seen by the frame,
+                nothing is shared when the slot has been reclaimed and reused since.
+        """
+        if consumers <= 1 or not is_tracked_slot(memory_id):
+            return
+        table, idx = self.__slot_table(memory_id)
+        if table is None:
+            return
+        with refs_lock:
+            if generation is not None and table[idx, 1] != generation:
+                logger.warning(f"shared memory: {memory_id} already reused, skip share")
+                return
+            if table[idx, 0] > 0:
+                table[idx, 0] += consumers - 1
+
+    def __release_ref(self, memory_id: str, generation: int = None):
+        """释放一个引用, 最后一个引用释放时删除共享内存或将槽位置为空闲"""
+        table, idx = self.__slot_table(memory_id)
+        if table is None:
+            return
+        with refs_lock:
+            # 槽位已被回收并被其他帧复用, 迟到的释放不能减少新帧的引用
+            if generation is not None and table[idx, 1] != generation:
+                logger.warning(
+                    f"shared memory: {memory_id} already reused, skip release"
+                )
+                return
+            count = table[idx, 0]
+            if count <= 0:
+                logger.warning(f"shared memory: {memory_id} already released")
+                return
+            if count == 1 and not is_pool_slot(memory_id):
+                # 先删除再置零, 创建者只复用引用计数为0的槽位
+                SharedMemoryFrames.free(memory_id)
+            table[idx, 0] -= 1
+        logger.debug(f"release shared memory ref: {memory_id}")
+
+    def destroy_slots(self):
+        if self._slots_pid != os.getpid():
+            return
+        for slots in [*self._pools.values(), self._frames]:
+            if slots is not None:
+                slots.destroy()
+                self.__journal(f"x {slots.slots_id}")
+        self._pools, self._frames = {}, None
+
+    def register_consumer(self, topic: str, node_id: str):
+        """
+        Register the node as a consumer of the shared memory sent on the topic.
+
+        The registration is refreshed while the node runs and removed at exit, the
+        senders of the topic hand their reference to every registered consumer.
+
+        Args:
+            topic (str): The topic the node receives from.
+            node_id (str): The node id.
+        """
+        fp = os.path.join(self.__consumer_dir(topic), node_id)
+        os.makedirs(os.path.dirname(fp), exist_ok=True)
+        open(fp, "w").close()
+        bg_tasks.add_job(
+            os.utime, "interval", args=(fp,), seconds=SHARED_MEMORY_CONSUMER_TTL / 3
+        )
+        atexit.register(lambda: os.path.exists(fp) and os.remove(fp))
+        logger.info(f"register shared memory consumer: {node_id} of topic: {topic}")
+
+    def consumers(self, topic: str) -> int:
+        """
+        Return the number of consumers registered on the topic, counted at most once a second.
+
+        Args:
+            topic (str): The topic of the sender.
+
+        Returns:
+            int: The number of registered consumers.
+        """
+        now = time.time()
+        count, counted_at = self._consumers.get(topic, (0, 0))
+        if now - counted_at < 1:
+            return count
+        count = 0
+        consumer_dir = self.__consumer_dir(topic)
+        if os.path.isdir(consumer_dir):
+            for entry in os.scandir(consumer_dir):
+                try:
+                    if now - entry.stat().st_mtime < SHARED_MEMORY_CONSUMER_TTL:
+                        count += 1
+                except FileNotFoundError:
+                    continue
+        self._consumers[topic] = (count, now)
+        return count
+
+    @staticmethod
+    def __consumer_dir(topic: str) -> str:
+        # topic 中可能包含 "/", 使用其摘要作为目录名
+        return os.path.join(SHARED_MEMORY_CONSUMER_DIR, generate_short_uid(topic))
+
+    def remove(self, memory_id: str, generation: int = None):
+        """
+        Release the shared memory, or one reference of a reference counted slot.
+
+        Args:
+            memory_id (str): The memory id.
+            generation (int, optional): The generation of the slot seen by the caller,
+                the release is skipped when the slot has been reused since.
+        """
+        if is_tracked_slot(memory_id):
+            return self.__release_ref(memory_id, generation)
         try:
-            self._memory_store.pop(memory_id, None)
+            if self._memory_store.pop(memory_id, None) is not None:
+                self.__journal(f"- {memory_id}")
             sa.delete(memory_id)
         except FileNotFoundError:
             logger.warning(f"not found memory id: {memory_id} info")
 
         logger.debug(f"release shared memory: {memory_id}")
 
+    def handover(self) -> dict:
+        """交出当前记录的共享内存ID, 用于子进程将创建的内存转交给主进程管理"""
+        memory_store, self._memory_store = self._memory_store, dict()
+        self._expiry = []
+        return memory_store
+
+    def takeover(self, memory_store: dict):
+        """接管其他进程创建的共享内存ID"""
+        for memory_id, timestamp in memory_store.items():
+            self.__track(memory_id, timestamp)
+
+    def __journal(self, line: str):
+        """追加一条记录, 只由创建管理器的进程写入"""
+        if self._journal_fd is None or self._slots_pid != os.getpid():
+            return
+        with self._journal_lock:
+            os.write(self._journal_fd, f"{line}\n".encode())
+            self._journal_lines += 1
+
     def dump(self):
-        with open(self._fp, "w") as f:
-            json.dump(self._memory_store, f)
+        """
+        Compact the journal into the current records.
+
+        Every line is written to a new file that replaces the journal, so a crash
+        during the compaction keeps the old journal.
+        """
+        if self._slots_pid != os.getpid():
+            return
+        lines = [f"pid {os.getpid()}"]
+        lines += [f"+ {k} {v}" for k, v in self._memory_store.copy().items()]
+        lines += [
+            f"s {slots.slots_id} {slots.size}"
+            for slots in [*self._pools.values(), self._frames]
+            if slots is not None
+        ]
+        with self._journal_lock:
+            tmp_fp = f"{self._fp}.tmp"
+            with open(tmp_fp, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp_fp, self._fp)
+            if self._journal_fd is not None:
+                os.close(self._journal_fd)
+            self._journal_fd = os.open(self._fp, os.O_WRONLY | os.O_APPEND)
+            self._journal_lines = len(lines)
         logger.info(
             f"dump shared memory id store: {self._fp} length: {len(self._memory_store)}"
         )
@@ -72,22 +627,64 @@ class SharedMemoryIDManager(metaclass=SingletonOptimized):
 
     def remove_expired(self):
         count = 0
-        for memory_id, timestamp in self._memory_store.copy().items():
-            if time.time() - timestamp > self._expire:
-                self.remove(memory_id)
-                count += 1
+        deadline = time.time() - self._expire
+        expiry = self._expiry
+        while expiry and expiry[0][0] < deadline:
+            timestamp, memory_id = heapq.heappop(expiry)
+            # 已释放或被重新记录的共享内存
+            if self._memory_store.get(memory_id) != timestamp:
+                continue
+            self.remove(memory_id)
+            count += 1
+        # 下游未全部释放的槽位超时后回收
+        for slots in [*self._pools.values(), self._frames]:
+            if slots is not None:
+                count += slots.reclaim_expired(self._expire)
         logger.info(f"remove expired shared memory id store: {self._fp} count: {count}")
+        # 日志中已释放的记录过多时压缩
+        if self._journal_lines > 2 * len(self._memory_store) + 1024:
+            self.dump()
 
-    def __load(self):
-        try:
-            with open(self._fp, "r") as f:
-                data = json.load(f)
-                # 更新内存数据
-                self._memory_store.update(data)
-        except Exception as e:
-            logger.warning(f"load shared memory id store: {self._fp} failed: {e}")
-            return {}
+    def __load(self) -> Tuple[Dict[str, float], Dict[str, int], Optional[int]]:
+        """读取上次运行的记录, 返回共享内存ID, 槽位表与写入日志的进程"""
+        memory_store = {}
+        if os.path.exists(self._legacy_fp):
+            try:
+                with open(self._legacy_fp, "r") as f:
+                    memory_store.update(json.load(f))
+            except Exception as e:
+                logger.warning(
+                    f"load shared memory id store: {self._legacy_fp} failed: {e}"
+                )
+        if not os.path.exists(self._fp):
+            return memory_store, {}, None
+        journal_store, slots, owner = read_journal(self._fp)
+        memory_store.update(journal_store)
+        return memory_store, slots, owner
+
+    def __touch_journal(self):
+        """定时刷新日志的修改时间, 表明记录的共享内存仍被运行中的进程持有"""
+        if self._slots_pid == os.getpid() and os.path.exists(self._fp):
+            os.utime(self._fp)
 
     def __load_and_flush(self):
-        self.__load()
+        # 与主机级的共享内存清理互斥, 避免同时处理同一日志
+        with refs_lock:
+            memory_store, slots, owner = self.__load()
+            if owner is not None and owner != os.getpid() and is_pid_alive(owner):
+                # 同一 manager_id 的进程仍在运行, 只按过期时间清理
+                logger.warning(
+                    f"shared memory id store: {self._fp} is owned by running process {owner}"
+                )
+                for memory_id, timestamp in memory_store.items():
+                    self.__track(memory_id, timestamp)
+            elif memory_store or slots:
+                count, nbytes = delete_segments(journal_segments(memory_store, slots))
+                logger.info(
+                    f"reclaim shared memory of exited process {owner}: {self._fp} "
+                    f"count: {count} bytes: {nbytes}"
+                )
+            self.dump()
+        if os.path.exists(self._legacy_fp):
+            os.remove(self._legacy_fp)
         self.remove_expired()
@@ -0,0 +1,60 @@
+from threading import Lock
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from .types import RawPayload
+
+
+class FrameSynchronizer:
+    """
+    多接收者按时间戳对齐的数据帧同步器
+
+    - 每个接收者一个有界缓冲, 满时丢弃该接收者最旧的帧
+    - 各缓冲最早的帧时间戳相差不超过 tolerance 秒时, 按接收者顺序组成一组输出
+    - 最早的帧与其他接收者已无法对齐时丢弃, 丢弃的帧交由 drop 释放共享内存
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        tolerance: float,
+        maxsize: int,
+        drop: Callable[[RawPayload], None],
+    ):
+        self._keys = list(keys)
+        self._tolerance = tolerance
+        self._drop = drop
+        self._lock = Lock()
+        self._buffers: Dict[str, deque] = {key: deque() for key in self._keys}
+        self._maxsize = maxsize
+
+    def put(self, key: str, payload: RawPayload) -> Optional[List[RawPayload]]:
+        """
+        Buffer the payload of a receiver and return the group it completes.
+
+        Args:
+            key (str): The receiver the payload came from.
+            payload (RawPayload): The received payload.
+
+        Returns:
+            Optional[List[RawPayload]]: One payload per receiver in receiver order,
+            or None if no group is complete yet.
+        """
+        with self._lock:
+            buffer = self._buffers[key]
+            if len(buffer) >= self._maxsize:
+                self._drop(buffer.popleft())
+            buffer.append(payload)
+            return self._match()
+
+    def _match(self) -> Optional[List[RawPayload]]:
+        buffers = [self._buffers[key] for key in self._keys]
+        while all(buffers):
+            heads = [buffer[0] for buffer in buffers]
+            timestamps = [payload.timestamp for payload in heads]
+            if max(timestamps) - min(timestamps) <= self._tolerance:
+                return [buffer.popleft() for buffer in buffers]
+            # 最早的帧比某个接收者最早的帧还早超过 tolerance, 之后的帧只会更晚, 无法再对齐
+            oldest = timestamps.index(min(timestamps))
+            self._drop(buffers[oldest].popleft())
+        return None
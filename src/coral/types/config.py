@@ -1,8 +1,16 @@
 from functools import cached_property
-from typing import List, Dict, Union
+from typing import List, Dict, Union, Optional
 
 from loguru import logger
-from pydantic import BaseModel, Field, computed_field, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    ValidationInfo,
+    computed_field,
+    field_validator,
+    model_validator,
+)
 
 from .payload import (
     DTManager,
@@ -13,7 +21,8 @@ from .payload import (
     RTManager,
     CoralBaseModel,
 )
-from ..constants import ENABLE_SHARED_MEMORY
+from ..constants import ENABLE_SHARED_MEMORY, BINARY_DATA_TYPE
+from ..compress import RAW_CODECS, RawCodec
 
 
 class ProtocalType:
@@ -43,6 +52,28 @@ class ReceiverMode:
     REQUEST = "request"
 
 
+class RunMode:
+    """
+    并行处理的运行模式
+    """
+
+    THREADS = "threads"
+    PROCESS = "process"
+
+
+class PayloadFormat:
+    """
+    节点间数据帧的传输格式
+    """
+
+    # model_dump 的字典, 由 wrapyfi 逐层编码与解码
+    NATIVE = "native"
+    # 可信格式: 数据帧由 pydantic-core 直接序列化为 json 字符串, 接收时由 pydantic-core 直接解析
+    TRUSTED = "trusted"
+    # 二进制格式: 可信格式的 json 与 raw 分段发送, raw 不做编码与复制, 仅支持 zeromq
+    BINARY = "binary"
+
+
 class ModeModel(BaseModel):
     """
     发送/接收者模式
@@ -80,6 +111,12 @@ class PubSubBaseModel(CoralBaseModel):
 
 
 class ReceiverModel(PubSubBaseModel):
+    # 开启 process.enable_fair_queue 时, 该接收者数据帧的调度权重
+    weight: int = Field(frozen=True, default=1)
+    # 该接收者每个数据源的目标帧率, 为空时使用 generic.target_fps
+    target_fps: float = Field(frozen=True, default=None)
+    # 只处理每个数据源最新的一帧, 处理不过来时积压的旧帧在解码前直接丢弃
+    conflate: bool = Field(frozen=True, default=False)
 
     @field_validator("raw_type")
     @classmethod
@@ -93,7 +130,11 @@ class ReceiverModel(PubSubBaseModel):
     @computed_field
     @cached_property
     def data_type(self) -> str:
-        return DTManager.registry[self.raw_type][0]
+        data_type = DTManager.registry[self.raw_type][0]
+        # zeromq 的接收者同时支持 json 格式与二进制格式
+        if data_type == "NativeObject" and self.mware == "zeromq":
+            return BINARY_DATA_TYPE
+        return data_type
 
     @computed_field
     @cached_property
@@ -102,6 +143,35 @@ class ReceiverModel(PubSubBaseModel):
 
 
 class SenderModel(PubSubBaseModel):
+    # 返参类所在的模块, 由 ConfigModel 按解析配置时指定的模块设置, 为空时使用全部注册的返参类
+    _registry_module: Optional[str] = PrivateAttr(default=None)
+    # 数据帧的传输格式, 接收者自动识别, 下游均为 Coral 节点时可使用 trusted
+    payload_format: str = Field(frozen=True, default=PayloadFormat.NATIVE)
+    # raw 随消息发送(未开启共享内存)时的压缩编码, 为空时不压缩; 接收者在首次访问 raw 时解码
+    raw_codec: str = Field(frozen=True, default=None)
+    # 压缩质量: jpeg/webp 为 1-100, png 为压缩级别 0-9; 为空时使用 OpenCV 的默认值
+    raw_quality: int = Field(frozen=True, default=None)
+
+    @field_validator("payload_format")
+    @classmethod
+    def validate_payload_format(cls, v):
+        payload_formats = [
+            PayloadFormat.NATIVE,
+            PayloadFormat.TRUSTED,
+            PayloadFormat.BINARY,
+        ]
+        if v not in payload_formats:
+            raise ValueError(
+                f"Unsupported payload_format: {v}, should in {payload_formats}"
+            )
+        return v
+
+    @field_validator("raw_codec")
+    @classmethod
+    def validate_raw_codec(cls, v):
+        if v is not None and v not in RAW_CODECS:
+            raise ValueError(f"Unsupported raw_codec: {v}, should in {RAW_CODECS}")
+        return v
 
     @field_validator("raw_type")
     @classmethod
@@ -110,19 +180,39 @@ class SenderModel(PubSubBaseModel):
             raise ValueError(
                 f"Invalid payload type: {v}, should in {list(DTManager.registry.keys())}"
             )
-        if RTManager.default_type() is None:
+        return v
+
+    @model_validator(mode="after")
+    def check_binary_format(self):
+        if self.payload_format != PayloadFormat.BINARY:
+            return self
+        if self.mware != "zeromq" or DTManager.registry[self.raw_type][0] != "NativeObject":
             raise ValueError(
-                "Not found ReturnPayload decorator by @RTManager.registry"
+                f"payload_format: {PayloadFormat.BINARY} only supports zeromq NativeObject senders"
             )
-        if len(RTManager.registry.keys()) > 1:
+        return self
+
+    @model_validator(mode="after")
+    def check_raw_quality(self):
+        if self.raw_quality is None:
+            return self
+        if self.raw_codec is None:
+            raise ValueError("raw_quality requires raw_codec")
+        low, high = (0, 9) if self.raw_codec == RawCodec.PNG else (1, 100)
+        # webp 的 quality 大于100时为无损压缩
+        if self.raw_quality < low or (
+            self.raw_quality > high and self.raw_codec != RawCodec.WEBP
+        ):
             raise ValueError(
-                f"More than one return type: {list(RTManager.registry.keys())}"
+                f"raw_quality of {self.raw_codec} should in [{low}, {high}], got {self.raw_quality}"
             )
-        return v
+        return self
 
     @computed_field
     @cached_property
     def data_type(self) -> str:
+        if self.payload_format == PayloadFormat.BINARY:
+            return BINARY_DATA_TYPE
         return DTManager.registry[self.raw_type][0]
 
     @computed_field
@@ -133,9 +223,10 @@ class SenderModel(PubSubBaseModel):
     @computed_field
     @cached_property
     def return_cls(self) -> ReturnPayload:
-        if RTManager.default_type() is None:
+        return_type = RTManager.default_type(self._registry_module)
+        if return_type is None:
             return ReturnPayload
-        return RTManager.registry[RTManager.default_type()]
+        return RTManager.registry[return_type]
 
 
 class MetaModel(CoralBaseModel):
@@ -163,8 +254,44 @@ class ProcessModel(CoralBaseModel):
     """
 
     max_qsize: int = Field(frozen=True, default=180)
+    # 队列中数据帧的内存预算, 超出时丢弃最旧的帧, 单位: MB, 0为不限制
+    max_qmemory: int = Field(frozen=True, default=0)
     count: int = Field(frozen=True, default=3)
     enable_parallel: bool = Field(frozen=True, default=False)
+    # 接收者轮询等待的超时时间, 单位: 毫秒
+    poll_timeout: int = Field(frozen=True, default=100)
+    run_mode: str = Field(frozen=True, default=RunMode.THREADS)
+    # 批处理: batch_size > 1 时开启, 凑批最多等待 batch_timeout 毫秒
+    batch_size: int = Field(frozen=True, default=1)
+    batch_timeout: int = Field(frozen=True, default=10)
+    enable_batch_metrics: bool = Field(frozen=True, default=True)
+    # 多worker时按 source_id 保序发送, 前序帧最多等待 reorder_timeout 毫秒
+    enable_reorder: bool = Field(frozen=True, default=False)
+    reorder_timeout: int = Field(frozen=True, default=100)
+    # 按数据源(source_id)分队列, 按接收者权重加权轮询, 此时 max_qsize 为每个数据源的队列长度
+    enable_fair_queue: bool = Field(frozen=True, default=False)
+    # AsyncCoralNode 同时处理中的最大帧数
+    max_concurrency: int = Field(frozen=True, default=64)
+    # 多接收者按时间戳对齐成组后交由 sender_group 处理, 同组时间戳最多相差 sync_tolerance 毫秒
+    enable_sync: bool = Field(frozen=True, default=False)
+    sync_tolerance: int = Field(frozen=True, default=50)
+    # 每个接收者等待对齐的最大帧数
+    sync_qsize: int = Field(frozen=True, default=30)
+
+    @field_validator("run_mode")
+    @classmethod
+    def validate_run_mode(cls, v):
+        run_modes = [RunMode.THREADS, RunMode.PROCESS]
+        if v not in run_modes:
+            raise ValueError(f"Unsupported run_mode: {v}, should in {run_modes}")
+        return v
+
+    @model_validator(mode="after")
+    def check_sync_batch(self):
+        # 成组的数据帧由 sender_group 处理, 不能再凑批
+        if self.enable_sync and self.batch_size > 1:
+            raise ValueError("enable_sync 开启时, batch_size 必须为1")
+        return self
 
 
 class GenericParamsModel(CoralBaseModel):
@@ -173,6 +300,26 @@ class GenericParamsModel(CoralBaseModel):
     """
 
     skip_frame: int = Field(frozen=True, default=0, description="每隔几帧处理一次")
+    target_fps: float = Field(
+        frozen=True,
+        default=0,
+        description="每个数据源按时间戳采样的目标帧率, 0为不开启, 开启后忽略skip_frame",
+    )
+    max_frame_age: int = Field(
+        frozen=True,
+        default=0,
+        description="数据帧的最大帧龄(毫秒), 接收与出队时超过则丢弃, 0为不限制",
+    )
+    target_latency: float = Field(
+        frozen=True,
+        default=0,
+        description="自适应跳帧的目标节点延迟(毫秒), 0为不开启, 开启后忽略skip_frame",
+    )
+    cpu_budget: float = Field(
+        frozen=True,
+        default=0,
+        description="自适应跳帧的CPU预算(核数), 0为不开启, 开启后忽略skip_frame",
+    )
     enable_metrics: bool = Field(
         frozen=True, default=True, description="是否开启服务监控"
     )
@@ -182,6 +329,11 @@ class GenericParamsModel(CoralBaseModel):
         validate_default=True,
         description="是否开启共享内存",
     )
+    shared_memory_pool_size: int = Field(
+        frozen=True,
+        default=0,
+        description="共享内存槽位池每种 shape 的槽位数, 0为不开启, 每帧创建与删除共享内存",
+    )
 
     @field_validator("enable_shared_memory")
     @classmethod
@@ -211,26 +363,72 @@ class ConfigModel(CoralBaseModel):
     meta: MetaModel = Field(frozen=True)
     generic: GenericParamsModel = Field(frozen=True, default=GenericParamsModel())
     params: Dict = Field(frozen=True, default=None)
+    # 参数类与返参类所在的模块, 来自解析配置时的 context["registry_module"]
+    _registry_module: Optional[str] = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def check_process_run_mode(self):
+        # 多进程模式下数据帧通过共享内存ID在进程间传递, 必须开启共享内存
+        if (
+            self.process.enable_parallel
+            and self.process.run_mode == RunMode.PROCESS
+            and not self.generic.enable_shared_memory
+        ):
+            raise ValueError(
+                "process.run_mode 为 process 时, 必须开启 generic.enable_shared_memory"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def check_raw_codec(self):
+        # 开启共享内存时只发送共享内存ID, raw 不随消息发送
+        sender = self.meta.sender
+        if sender is not None and sender.raw_codec and self.generic.enable_shared_memory:
+            logger.warning(
+                f"{self.node_id} 开启了共享内存, meta.sender.raw_codec: {sender.raw_codec} 不生效"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def check_return_type(self, info: ValidationInfo):
+        # 多个节点运行在同一进程时, 只使用节点所在模块注册的返参类
+        self._registry_module = (info.context or {}).get("registry_module")
+        sender = self.meta.sender
+        if sender is None:
+            return self
+        sender._registry_module = self._registry_module
+        registry = RTManager.scoped_registry(self._registry_module)
+        if not registry:
+            raise ValueError(
+                "Not found ReturnPayload decorator by @RTManager.registry"
+            )
+        if len(registry.keys()) > 1:
+            raise ValueError(f"More than one return type: {list(registry.keys())}")
+        return self
 
     @field_validator("params")
     @classmethod
-    def check_params_type(cls, v):
+    def check_params_type(cls, v, info: ValidationInfo):
         if v is None:
             return v
-        if PTManager.default_type() is None:
+        registry = PTManager.scoped_registry(
+            (info.context or {}).get("registry_module")
+        )
+        if not registry:
             raise ValueError(
                 "未发现被 @PTManager.register() 装饰器包装的 ParamsModel 类"
             )
-        if len(PTManager.registry.keys()) > 1:
+        if len(registry.keys()) > 1:
             raise ValueError(
-                f"存在多个 @PTManager.register() 装饰的 ParamsModel 类: {list(PTManager.registry.keys())}"
+                f"存在多个 @PTManager.register() 装饰的 ParamsModel 类: {list(registry.keys())}"
             )
-        pt_cls = PTManager.registry[PTManager.default_type()]
+        pt_cls = list(registry.values())[0]
         return pt_cls(**v)
 
     @computed_field
     @cached_property
     def _params_cls(self) -> BaseParamsModel:
-        if PTManager.default_type() is None:
+        params_type = PTManager.default_type(self._registry_module)
+        if params_type is None:
             return None
-        return PTManager.registry[PTManager.default_type()]
+        return PTManager.registry[params_type]
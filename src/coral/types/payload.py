@@ -9,8 +9,13 @@ from pydantic import BaseModel, Field, WithJsonSchema, PrivateAttr, computed_fie
 from wrapyfi.publishers import Publishers
 
 from ..utils import generate_short_uid
+from ..compress import CompressedRaw, decompress_raw
 from ..constants import SHARED_DATA_TYPE
-from ..sched import SharedMemoryIDManager as SMIM
+from ..sched import SharedMemoryIDManager as SMIM, is_pool_slot
+
+# 估算数据帧内存占用时, 除 raw 以外的基础开销与每个 objects/metas 条目的开销(字节)
+PAYLOAD_BASE_NBYTES = 1024
+PAYLOAD_ITEM_NBYTES = 512
 
 # 指定json_schema类型的numpy类型，否则numpy类型的字段无法序列化
 CoralIntNdarray = Annotated[
@@ -117,6 +122,30 @@ class ObjectsPayload(BaseInterfacePayload):
     objects: Union[List[ObjectPayload], None] = None
 
 
+def _is_same_array(a: np.ndarray, b: np.ndarray) -> bool:
+    return (
+        isinstance(a, np.ndarray)
+        and isinstance(b, np.ndarray)
+        and a.shape == b.shape
+        and a.dtype == b.dtype
+        and a.__array_interface__["data"][0] == b.__array_interface__["data"][0]
+    )
+
+
+def _is_shared_memory_data(_raw: np.ndarray, _raw_shared_memory_id: str) -> bool:
+    """
+    _raw 是否为共享内存中的完整数据
+
+    同一共享内存每次 attach 的地址不同, 按 _raw 所在映射的共享内存名称判断
+    """
+    root, base = None, _raw
+    while isinstance(base, np.ndarray):
+        root, base = base, base.base
+    return getattr(base, "name", None) == _raw_shared_memory_id and _is_same_array(
+        _raw, root
+    )
+
+
 class BaseRawPayload(CoralBaseModel):
     """
     Base通用节点通信数据类, 涵盖共享内存的管理
@@ -127,18 +156,20 @@ class BaseRawPayload(CoralBaseModel):
     _raw: CoralIntNdarray = PrivateAttr(default=None)
     _raw_shared_memory_id: str = PrivateAttr(default=None)
     _enable_shared_memory: bool = PrivateAttr(default=False)
+    # 共享内存槽位的分配次数, 用于判断槽位是否已被其他帧复用
+    _raw_generation: int = PrivateAttr(default=None)
 
     def __init__(self, **data):
         super().__init__(**data)
         self._init_private_field(data)
 
     def model_dump(self, *args, **kwargs):
-        exclude = kwargs.get("exclude", [])
+        exclude = set(kwargs.pop("exclude", None) or ())
         if self._enable_shared_memory:
-            exclude.append("raw")
+            exclude.add("raw")
             data = super().model_dump(exclude=exclude, *args, **kwargs)
         else:
-            exclude.append("raw_shared_memory_id")
+            exclude.update({"raw_shared_memory_id", "raw_generation"})
             data = super().model_dump(exclude=exclude, *args, **kwargs)
         return data
 
@@ -153,104 +184,191 @@ class BaseRawPayload(CoralBaseModel):
         """可被继承的方法"""
         return raw
 
-    def _fetch_shared_memory_data(self, _raw_shared_memory_id: str):
-        """在共享内存中获取数据"""
+    def _fetch_shared_memory_data(
+        self, _raw_shared_memory_id: str, _raw_generation: int = None
+    ):
+        """在共享内存中获取数据, 传入发送时的分配次数时校验槽位是否已被复用"""
         try:
             _raw = SMIM().attach(_raw_shared_memory_id)
         except FileNotFoundError as e:
             raise FileNotFoundError(
                 f"未找到共享内存: {_raw_shared_memory_id} 信息: {e}"
             )
+        generation = SMIM().generation(_raw_shared_memory_id)
+        if _raw_generation is not None and generation != _raw_generation:
+            raise FileNotFoundError(
+                f"共享内存 {_raw_shared_memory_id} 已被回收并被其他数据帧复用, "
+                f"发送时的分配次数: {_raw_generation} 当前: {generation}"
+            )
+        self._raw_generation = generation
         return _raw, _raw_shared_memory_id
 
+    def __record_generation(self, _raw_shared_memory_id: str):
+        # 未记录引用计数的共享内存没有分配次数, 需覆盖之前槽位的分配次数
+        self._raw_generation = SMIM().generation(_raw_shared_memory_id)
+
     def _create_shared_memory_data(self, _raw: np.ndarray):
         """创建共享内存数据"""
-        _raw_shared_memory_id = f"{SHARED_DATA_TYPE}{self.raw_id}"
-        memory_data = SMIM().add(_raw_shared_memory_id, _raw.shape, _raw.dtype)
+        _raw_shared_memory_id, memory_data = SMIM().acquire(
+            f"{SHARED_DATA_TYPE}{self.raw_id}", _raw.shape, _raw.dtype
+        )
         memory_data[:] = _raw
+        self.__record_generation(_raw_shared_memory_id)
         return _raw, _raw_shared_memory_id
 
-    def _compare_and_repair_memory_data(self, _raw, _raw_shared_memory_id):
-        """比较外部_raw和共享内存内的数据，并修复"""
-        try:
-            memory_data = SMIM().attach(_raw_shared_memory_id)
-        except FileNotFoundError:
-            _raw, _raw_shared_memory_id = self._create_shared_memory_data(_raw)
-            logger.warning(
-                f"未找到共享内存: {_raw_shared_memory_id} 信息, 但是存在 _raw: "
-                f"{_raw.shape} {_raw.dtype} 信息，依据 _raw信息创建共享内存"
+    def _compare_and_repair_memory_data(
+        self, _raw, _raw_shared_memory_id, _raw_generation: int = None
+    ):
+        """
+        校验 _raw 是否为共享内存内的数据, 不是时依据 _raw 创建新的共享内存
+
+        - 只比较数据地址、shape 与 dtype 以及槽位的分配次数, 不逐元素比较
+        - 构造时还没有 self._raw, 与 attach 的传入共享内存比较, 同时校验其存在且未被复用
+        - 共享内存可能仍被其他节点读取, 不写入新的数据
+        """
+        current = self._raw
+        if current is None:
+            current, _ = self._fetch_shared_memory_data(
+                _raw_shared_memory_id, _raw_generation
+            )
+        if not (
+            _is_same_array(_raw, current)
+            or _is_shared_memory_data(_raw, _raw_shared_memory_id)
+        ):
+            return self._create_shared_memory_data(_raw)
+        generation = self._raw_generation
+        if generation is not None and generation != SMIM().generation(
+            _raw_shared_memory_id
+        ):
+            raise FileNotFoundError(
+                f"共享内存 {_raw_shared_memory_id} 已被回收并被其他数据帧复用, "
+                f"_raw -> {_raw.shape} {_raw.dtype} 的数据已被覆盖"
             )
-        else:
-            if not np.equal(memory_data, _raw):
-                raise FileNotFoundError(
-                    f"共享内存 {_raw_shared_memory_id} -> {memory_data.shape} {memory_data.dtype} 的值和"
-                    f"字段 _raw -> {_raw.shape} {_raw.dtype} 的数据不一致 "
-                )
         return _raw, _raw_shared_memory_id
 
-    def release_shared_memory(self, shared_memroy_id: str = None):
-        """释放共享内存数据"""
+    def release_shared_memory(
+        self, shared_memroy_id: str = None, _raw_generation: int = None
+    ):
+        """释放共享内存数据, 槽位已被其他数据帧复用时不释放"""
         _raw_shared_memory_id = shared_memroy_id or self._raw_shared_memory_id
+        if shared_memroy_id is None:
+            _raw_generation = self._raw_generation
         if _raw_shared_memory_id:
             try:
-                SMIM().remove(_raw_shared_memory_id)
+                SMIM().remove(_raw_shared_memory_id, _raw_generation)
                 self._raw_shared_memory_id = None
             except FileNotFoundError as e:
                 logger.warning(f"未找到共享内存: {_raw_shared_memory_id} 信息: {e}")
 
     def _init_private_field(self, data):
-        _raw = (
-            self.check_raw_data(data.get("raw"))
-            if data.get("raw") is not None
-            else None
-        )
+        _raw = data.get("raw")
+        if _raw is not None and data.get("raw_codec"):
+            # 不开启共享内存时, 压缩的 raw 在首次访问时才解码
+            if not data.get("enable_shared_memory"):
+                self._enable_shared_memory = False
+                self._raw = CompressedRaw(_raw, data["raw_codec"])
+                return
+            _raw = decompress_raw(_raw)
+        _raw = self.check_raw_data(_raw) if _raw is not None else None
         _raw_shared_memory_id = (
             self.__check_raw_shared_memory_id(data.get("raw_shared_memory_id"))
             if data.get("raw_shared_memory_id") is not None
             else None
         )
+        # 发送时槽位的分配次数
+        _raw_generation = data.get("raw_generation")
         _enable_shared_memory = data.get("enable_shared_memory")
         if _enable_shared_memory:
             # 从共享内存中获取数据
             if _raw is None and _raw_shared_memory_id:
                 _raw, _raw_shared_memory_id = self._fetch_shared_memory_data(
-                    _raw_shared_memory_id
+                    _raw_shared_memory_id, _raw_generation
                 )
             # 创建共享内存
             elif _raw is not None and not _raw_shared_memory_id:
                 _raw, _raw_shared_memory_id = self._create_shared_memory_data(_raw)
             # 从共享内存中获取数据与_raw数据比对
             elif _raw is not None and _raw_shared_memory_id:
-                _raw, _raw_shared_memory_id = self._compare_and_repair_memory_data(
-                    _raw, _raw_shared_memory_id
+                _raw, memory_id = self._compare_and_repair_memory_data(
+                    _raw, _raw_shared_memory_id, _raw_generation
                 )
+                # 新的数据已写入新的共享内存, 释放传入的共享内存
+                if memory_id != _raw_shared_memory_id:
+                    self.release_shared_memory(_raw_shared_memory_id, _raw_generation)
+                _raw_shared_memory_id = memory_id
 
             self._enable_shared_memory = True
             self._raw_shared_memory_id = _raw_shared_memory_id
         else:
             self._enable_shared_memory = False
-            if not _raw and _raw_shared_memory_id:
-                _raw, _ = self._fetch_shared_memory_data(_raw_shared_memory_id)
+            if _raw is None and _raw_shared_memory_id:
+                _raw, _ = self._fetch_shared_memory_data(
+                    _raw_shared_memory_id, _raw_generation
+                )
+                # 槽位池的槽位释放后会被复用, 需复制
+                if is_pool_slot(_raw_shared_memory_id):
+                    _raw = _raw.copy()
 
-            self.release_shared_memory(_raw_shared_memory_id)
+            self.release_shared_memory(_raw_shared_memory_id, _raw_generation)
         # 赋值私有变量
         self._raw = _raw
 
     @computed_field
     def raw(self) -> np.array:
-        return self._raw
+        _raw = self._raw
+        if isinstance(_raw, CompressedRaw):
+            _raw = self._raw = self.check_raw_data(_raw.decompress())
+        return _raw
+
+    @property
+    def has_raw(self) -> bool:
+        """是否存在 raw, 不会解码压缩的 raw"""
+        return self._raw is not None
 
     @computed_field
     def raw_shared_memory_id(self) -> str:
         return self._raw_shared_memory_id
 
+    @computed_field
+    def raw_generation(self) -> Optional[int]:
+        """共享内存槽位的分配次数, 随共享内存ID发送, 接收时据此判断槽位是否已被复用"""
+        return self._raw_generation
+
+    def alloc_raw(self, shape: tuple, dtype: np.dtype = np.uint8) -> np.ndarray:
+        """
+        分配 raw 的输出缓冲区, 开启共享内存时直接分配在共享内存中
+
+        - 在缓冲区中写入数据后作为 raw 返回, 如 FirstPayload(raw=buffer), 不再复制到共享内存
+        - 缓冲区的内容未初始化, 需完整写入
+        - 数据帧原有的共享内存被释放
+        """
+        if self._raw_shared_memory_id is not None:
+            self.release_shared_memory()
+        if self._enable_shared_memory:
+            _raw_shared_memory_id, buffer = SMIM().acquire(
+                f"{SHARED_DATA_TYPE}{self.raw_id}", shape, dtype
+            )
+            self.__record_generation(_raw_shared_memory_id)
+            self._raw_shared_memory_id = _raw_shared_memory_id
+        else:
+            buffer = np.empty(shape, dtype)
+        self._raw = buffer
+        return buffer
+
     def set_raw(self, raw: np.ndarray):
         _raw = self.check_raw_data(raw)
         if self._enable_shared_memory:
             if self._raw_shared_memory_id is not None:
+                # 创建新的共享内存时会记录新的分配次数
+                _raw_generation = self._raw_generation
                 _raw, _raw_shared_memory_id = self._compare_and_repair_memory_data(
                     _raw, self._raw_shared_memory_id
                 )
+                # 新的数据已写入新的共享内存, 释放原共享内存
+                if _raw_shared_memory_id != self._raw_shared_memory_id:
+                    self.release_shared_memory(
+                        self._raw_shared_memory_id, _raw_generation
+                    )
             else:
                 _raw, _raw_shared_memory_id = self._create_shared_memory_data(_raw)
 
@@ -272,6 +390,17 @@ class RawPayload(BaseRawPayload):
     objects: Union[List[ObjectPayload], None] = None
     metas: Union[Dict[str, ReturnPayload], None] = None
 
+    @property
+    def nbytes(self) -> int:
+        """数据帧占用内存的估算值, raw 按实际字节数计算"""
+        nbytes = PAYLOAD_BASE_NBYTES
+        # 未解码的压缩 raw 按压缩后的字节数计算
+        _raw = self._raw
+        if _raw is not None:
+            nbytes += _raw.nbytes
+        items = len(self.objects or []) + len(self.metas or {})
+        return nbytes + items * PAYLOAD_ITEM_NBYTES
+
 
 class DataTypeManager:
     """
@@ -332,9 +461,17 @@ class ParamsManager:
         return decorator
 
     @classmethod
-    def default_type(cls):
-        if cls.registry:
-            return list(cls.registry.keys())[0]
+    def scoped_registry(cls, module: str = None):
+        """module 为 None 时返回全部注册的类, 否则只返回定义在该模块中的类"""
+        if module is None:
+            return cls.registry
+        return {k: v for k, v in cls.registry.items() if v.__module__ == module}
+
+    @classmethod
+    def default_type(cls, module: str = None):
+        registry = cls.scoped_registry(module)
+        if registry:
+            return list(registry.keys())[0]
         return None
 
 
@@ -368,9 +505,17 @@ class ReturnManager:
         return decorator
 
     @classmethod
-    def default_type(cls):
-        if cls.registry:
-            return list(cls.registry.keys())[0]
+    def scoped_registry(cls, module: str = None):
+        """module 为 None 时返回全部注册的类, 否则只返回定义在该模块中的类"""
+        if module is None:
+            return cls.registry
+        return {k: v for k, v in cls.registry.items() if v.__module__ == module}
+
+    @classmethod
+    def default_type(cls, module: str = None):
+        registry = cls.scoped_registry(module)
+        if registry:
+            return list(registry.keys())[0]
         return None
 
 
@@ -1,3 +1,4 @@
+import os
 import uuid
 import hashlib
 
@@ -6,3 +7,14 @@ def generate_short_uid(uid: str = None):
     uid = uid or str(uuid.uuid4())
     hasher = hashlib.sha1(uid.encode())
     return hasher.hexdigest()[:8]
+
+
+def is_pid_alive(pid: int) -> bool:
+    """进程是否仍在运行, 无权限发送信号的进程视为运行中"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,133 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, Union
+
+import numpy as np
+import zmq
+from wrapyfi.publishers import Publishers
+from wrapyfi.listeners import Listeners
+from wrapyfi.publishers.zeromq import (
+    ZeroMQNativeObjectPublisher,
+    WATCHDOG_POLL_REPEAT as PUBLISHER_POLL_REPEAT,
+)
+from wrapyfi.listeners.zeromq import (
+    ZeroMQNativeObjectListener,
+    WATCHDOG_POLL_REPEAT as LISTENER_POLL_REPEAT,
+)
+
+from .codec import TRUSTED_PAYLOAD_KEY
+from .constants import BINARY_DATA_TYPE
+
+# 二进制格式的头部中, 带外传输的 ndarray 描述所在的字段
+BINARY_ARRAYS_KEY = "coral_arrays"
+
+Frame = Union[bytes, zmq.Frame]
+
+
+def _buffer(frame: Frame) -> Union[bytes, memoryview]:
+    return frame.buffer if isinstance(frame, zmq.Frame) else frame
+
+
+def _bytes(frame: Frame) -> bytes:
+    return frame.bytes if isinstance(frame, zmq.Frame) else frame
+
+
+def pack_message(data: Dict[str, Any]) -> List[Any]:
+    """
+    Pack a trusted payload into binary frames.
+
+    The frames are a small json header, the payload json and one frame per
+    ndarray. The header keeps source_id and raw_shared_memory_id, so the
+    message can still be inspected without decoding.
+
+    Args:
+        data (Dict[str, Any]): The data returned by encode_payload in the trusted format.
+
+    Returns:
+        List[Any]: The frames after the topic, the arrays are sent without copying.
+    """
+    header = {
+        key: value
+        for key, value in data.items()
+        if key != TRUSTED_PAYLOAD_KEY and not isinstance(value, np.ndarray)
+    }
+    arrays, buffers = [], []
+    for key, value in data.items():
+        if not isinstance(value, np.ndarray):
+            continue
+        value = np.ascontiguousarray(value)
+        arrays.append({"key": key, "dtype": value.dtype.str, "shape": value.shape})
+        buffers.append(value)
+    header[BINARY_ARRAYS_KEY] = arrays
+    payload = data[TRUSTED_PAYLOAD_KEY]
+    return [json.dumps(header).encode(), payload.encode(), *buffers]
+
+
+def unpack_message(
+    frames: List[Frame], object_hook: Callable = None, **deserializer_kwargs
+) -> Any:
+    """
+    Decode the frames of a message in the native json format or the binary format.
+
+    Args:
+        frames (List[Frame]): The frames after the topic.
+        object_hook (Callable, optional): The wrapyfi json decoder hook, used by the native format.
+
+    Returns:
+        Any: The decoded message, the binary format is decoded into the trusted payload format.
+    """
+    if len(frames) == 1:
+        return json.loads(
+            _bytes(frames[0]).decode(), object_hook=object_hook, **deserializer_kwargs
+        )
+    data = json.loads(_bytes(frames[0]))
+    arrays = data.pop(BINARY_ARRAYS_KEY)
+    data[TRUSTED_PAYLOAD_KEY] = _bytes(frames[1])
+    for array, frame in zip(arrays, frames[2:]):
+        # 直接使用 zmq 接收的内存, 不再复制
+        data[array["key"]] = np.frombuffer(
+            _buffer(frame), dtype=np.dtype(array["dtype"])
+        ).reshape(array["shape"])
+    return data
+
+
+@Publishers.register(BINARY_DATA_TYPE, "zeromq")
+class CoralBinaryPublisher(ZeroMQNativeObjectPublisher):
+    """
+    二进制格式的 zeromq 发布者
+
+    - 可信格式的数据帧打包为多段消息, ndarray 作为单独的消息段零拷贝发送
+    - 其他数据与 NativeObject 一致, 按 json 发送
+    """
+
+    def publish(self, obj):
+        if not isinstance(obj, dict) or TRUSTED_PAYLOAD_KEY not in obj:
+            return super().publish(obj)
+        if not self.established:
+            established = self.establish(repeats=PUBLISHER_POLL_REPEAT)
+            if not established:
+                return
+            # 与 NativeObject 一致, 等待订阅建立
+            time.sleep(0.2)
+        self._socket.send_multipart([self._topic, *pack_message(obj)], copy=False)
+
+
+@Listeners.register(BINARY_DATA_TYPE, "zeromq")
+class CoralBinaryListener(ZeroMQNativeObjectListener):
+    """
+    同时支持 NativeObject json 格式与二进制格式的 zeromq 接收者
+    """
+
+    def listen(self):
+        if not self.established:
+            established = self.establish(repeats=LISTENER_POLL_REPEAT)
+            if not established:
+                return None
+        if not self._socket.poll(timeout=None if self.should_wait else 0):
+            return None
+        frames = self._socket.recv_multipart(copy=False)
+        return unpack_message(
+            frames[1:],
+            object_hook=self._plugin_decoder_hook,
+            **self._deserializer_kwargs,
+        )
@@ -0,0 +1,14 @@
+import os
+import shutil
+import tempfile
+
+# coral.constants 在导入时读取挂载目录, 测试使用临时目录, 不影响主机上运行中节点的记录
+MOUNT_DIR = None
+if "CORAL_PIPE_MOUNT_DIR" not in os.environ:
+    MOUNT_DIR = tempfile.mkdtemp(prefix="coral_test_")
+    os.environ["CORAL_PIPE_MOUNT_DIR"] = MOUNT_DIR
+
+
+def pytest_unconfigure(config):
+    if MOUNT_DIR is not None:
+        shutil.rmtree(MOUNT_DIR, ignore_errors=True)
@@ -0,0 +1,56 @@
+from unittest import mock
+
+import pytest
+
+from coral.adaptive import AdaptiveSkipController
+
+
+def test_no_target_never_skips():
+    controller = AdaptiveSkipController()
+    for _ in range(10):
+        controller.observe(process_cost=1, node_cost=1)
+    assert controller.skip_ratio == 0
+    assert not any(controller.is_pass("cam") for _ in range(10))
+
+
+def test_skip_ratio_follows_target_latency():
+    controller = AdaptiveSkipController(target_latency=0.1, gain=0.05, smoothing=1)
+    for _ in range(10):
+        controller.observe(process_cost=0.05, node_cost=0.2)
+    assert controller.skip_ratio == pytest.approx(0.5)
+    # 满足目标延迟后逐步减少跳帧
+    for _ in range(5):
+        controller.observe(process_cost=0.05, node_cost=0.05)
+    assert controller.skip_ratio == pytest.approx(0.375)
+    for _ in range(100):
+        controller.observe(process_cost=0.05, node_cost=0.05)
+    assert controller.skip_ratio == 0
+
+
+def test_skip_ratio_is_capped():
+    controller = AdaptiveSkipController(target_latency=0.1, max_skip_ratio=0.8)
+    for _ in range(100):
+        controller.observe(process_cost=0.05, node_cost=10)
+    assert controller.skip_ratio == pytest.approx(0.8)
+
+
+def test_skip_ratio_follows_cpu_budget():
+    controller = AdaptiveSkipController(cpu_budget=0.5, smoothing=1)
+    # 每0.1秒处理一帧, 每帧耗时0.1秒, 占用1个核
+    with mock.patch("coral.adaptive.time.time") as now:
+        for idx in range(5):
+            now.return_value = idx * 0.1
+            controller.observe(process_cost=0.1, node_cost=0.1)
+    assert controller.skip_ratio > 0
+
+
+def test_frames_are_skipped_evenly_per_source():
+    controller = AdaptiveSkipController(target_latency=0.1, gain=0.05, smoothing=1)
+    for _ in range(10):
+        controller.observe(process_cost=0.05, node_cost=0.2)
+    passes = [controller.is_pass("cam") for _ in range(100)]
+    assert sum(passes) == 50
+    # 均匀跳帧, 不会连续跳过
+    assert not any(a and b for a, b in zip(passes, passes[1:]))
+    # 各数据源独立计算额度
+    assert sum(controller.is_pass("other") for _ in range(100)) == 50
@@ -0,0 +1,104 @@
+import os
+import time
+import uuid
+import subprocess
+
+import numpy as np
+import pytest
+import SharedArray as sa
+
+from coral.constants import (
+    SHARED_DATA_TYPE,
+    SHARED_MEMORY_DIR,
+    SHARED_MEMORY_ID_STORE_DIR,
+    SHARED_MEMORY_JOURNAL_TTL,
+)
+from coral.janitor import SharedMemoryJanitor
+
+# 宽限时间远大于主机上其他共享内存的存在时间, 只有测试中修改过时间的共享内存会被视为孤立
+GRACE = 365 * 24 * 3600
+ANCIENT = time.time() - 2 * GRACE
+
+
+def dead_pid() -> int:
+    proc = subprocess.Popen(["true"])
+    proc.wait()
+    return proc.pid
+
+
+def path(memory_id: str) -> str:
+    return os.path.join(SHARED_MEMORY_DIR, memory_id[len(SHARED_DATA_TYPE) :])
+
+
+@pytest.fixture
+def segments():
+    memory_ids = []
+
+    def create(name: str) -> str:
+        memory_id = f"{SHARED_DATA_TYPE}{name}"
+        sa.create(memory_id, (4, 4), np.uint8)
+        memory_ids.append(memory_id)
+        return memory_id
+
+    yield create
+    for memory_id in memory_ids:
+        if os.path.exists(path(memory_id)):
+            sa.delete(memory_id)
+
+
+def write_journal(memory_id: str, owner: int, alive: bool) -> str:
+    fp = os.path.join(SHARED_MEMORY_ID_STORE_DIR, f"test_{uuid.uuid4().hex[:8]}.journal")
+    with open(fp, "w") as f:
+        f.write(f"pid {owner}\n+ {memory_id} {time.time()}\n")
+    if not alive:
+        # 超过有效期未刷新
+        mtime = time.time() - SHARED_MEMORY_JOURNAL_TTL * 2
+        os.utime(fp, (mtime, mtime))
+    return fp
+
+
+def test_dry_run_only_counts(segments):
+    memory_id = segments(f"coraltest-{uuid.uuid4().hex[:8]}")
+    fp = write_journal(memory_id, dead_pid(), alive=False)
+    result = SharedMemoryJanitor(grace=GRACE, dry_run=True).sweep()
+    assert result["segments"] >= 1
+    assert result["bytes"] >= os.stat(path(memory_id)).st_size
+    assert os.path.exists(path(memory_id))
+    assert os.path.exists(fp)
+    os.remove(fp)
+
+
+def test_delete_segments_of_exited_node(segments):
+    memory_id = segments(f"coraltest-{uuid.uuid4().hex[:8]}")
+    fp = write_journal(memory_id, dead_pid(), alive=False)
+    result = SharedMemoryJanitor(grace=GRACE).sweep()
+    assert result["segments"] >= 1
+    assert result["journals"] >= 1
+    assert not os.path.exists(path(memory_id))
+    assert not os.path.exists(fp)
+
+
+def test_keep_segments_of_running_node(segments):
+    memory_id = segments(f"coraltest-{uuid.uuid4().hex[:8]}")
+    # 日志定时刷新, 即使进程号不可比较也视为运行中
+    fp = write_journal(memory_id, dead_pid(), alive=True)
+    SharedMemoryJanitor(grace=GRACE).sweep()
+    assert os.path.exists(path(memory_id))
+    os.remove(fp)
+
+
+def test_orphan_raw_segment(segments):
+    memory_id = segments(uuid.uuid4().hex[:8])
+    os.utime(path(memory_id), (ANCIENT, ANCIENT))
+    result = SharedMemoryJanitor(grace=GRACE, dry_run=True).sweep()
+    assert result["segments"] >= 1
+    assert os.path.exists(path(memory_id))
+    SharedMemoryJanitor(grace=GRACE).sweep()
+    assert not os.path.exists(path(memory_id))
+
+
+def test_keep_segments_of_other_programs(segments):
+    memory_id = segments(f"othertest-{uuid.uuid4().hex[:8]}")
+    os.utime(path(memory_id), (ANCIENT, ANCIENT))
+    SharedMemoryJanitor(grace=GRACE).sweep()
+    assert os.path.exists(path(memory_id))
@@ -0,0 +1,111 @@
+import time
+import threading
+
+from coral.queues import PayloadQueue, FairPayloadQueue
+
+
+def test_put_drops_oldest_when_full():
+    queue = PayloadQueue(maxsize=2)
+    assert queue.put(1) == []
+    assert queue.put(2) == []
+    assert queue.full()
+    assert queue.put(3) == [1]
+    assert [queue.get(), queue.get()] == [2, 3]
+
+
+def test_get_returns_none_after_timeout():
+    queue = PayloadQueue(maxsize=2)
+    assert queue.get(timeout=0.01) is None
+
+
+def test_get_wakes_up_on_put():
+    queue = PayloadQueue(maxsize=2)
+    timer = threading.Timer(0.05, queue.put, args=("item",))
+    timer.start()
+    assert queue.get(timeout=5) == "item"
+    timer.join()
+
+
+def test_get_batch():
+    queue = PayloadQueue(maxsize=10)
+    for item in range(5):
+        queue.put(item)
+    assert queue.get_batch(3, wait=0) == [0, 1, 2]
+    # 不足一批时最多等待 wait 秒
+    assert queue.get_batch(3, wait=0.01) == [3, 4]
+    assert queue.get_batch(3, wait=0, timeout=0.01) == []
+
+
+def test_byte_budget_drops_oldest():
+    queue = PayloadQueue(maxsize=10, max_bytes=100, sizeof=len)
+    assert queue.put("a" * 40) == []
+    assert queue.put("b" * 40) == []
+    assert queue.nbytes == 80
+    assert queue.put("c" * 40) == ["a" * 40]
+    assert queue.nbytes == 80
+    assert queue.get() == "b" * 40
+    # 出队后立即扣除字节数
+    assert queue.nbytes == 40
+
+
+def test_byte_budget_keeps_newest_item():
+    queue = PayloadQueue(maxsize=10, max_bytes=100, sizeof=len)
+    queue.put("a" * 40)
+    assert queue.put("b" * 200) == ["a" * 40]
+    assert len(queue) == 1
+    assert queue.nbytes == 200
+
+
+def test_fair_queue_byte_budget_drops_from_longest_source():
+    queue = FairPayloadQueue(maxsize=10, max_bytes=100, sizeof=len)
+    queue.put("a" * 30, key="a")
+    queue.put("b" * 30, key="b")
+    queue.put("B" * 30, key="b")
+    assert queue.put("c" * 30, key="c") == ["b" * 30]
+    assert queue.nbytes == 90
+    assert sorted(queue.get() for _ in range(3)) == ["B" * 30, "a" * 30, "c" * 30]
+    assert queue.nbytes == 0
+
+def test_fair_queue_drops_oldest_of_the_full_source_only():
+    queue = FairPayloadQueue(maxsize=2)
+    queue.put("a1", key="a")
+    for item in ["b1", "b2", "b3"]:
+        dropped = queue.put(item, key="b")
+    assert dropped == ["b1"]
+    assert len(queue) == 3
+    assert sorted(queue.get() for _ in range(3)) == ["a1", "b2", "b3"]
+
+
+def test_fair_queue_weighted_round_robin():
+    queue = FairPayloadQueue(maxsize=100)
+    for idx in range(30):
+        queue.put(("a", idx), key="a", weight=3)
+        queue.put(("b", idx), key="b", weight=1)
+    keys = [queue.get()[0] for _ in range(20)]
+    assert keys.count("a") == 15
+    assert keys.count("b") == 5
+    # 平滑加权轮询: 权重小的数据源不会连续等待超过一轮
+    assert "b" in keys[:4]
+    # 同一数据源内保持先进先出
+    queue = FairPayloadQueue(maxsize=100)
+    for idx in range(3):
+        queue.put(idx, key="a")
+    assert [queue.get() for _ in range(3)] == [0, 1, 2]
+
+
+def test_fair_queue_evicts_idle_sources():
+    queue = FairPayloadQueue(maxsize=10, idle_timeout=0.05)
+    for idx in range(5):
+        queue.put(idx, key=f"source_{idx}")
+        assert queue.get() == idx
+    assert len(queue.sources) == 5
+    time.sleep(0.06)
+    queue.put("x", key="live")
+    assert queue.get() == "x"
+    assert queue.sources == ["live"]
+    # 仍有积压的数据源不会被移除
+    queue.put(1, key="busy")
+    queue.put(2, key="busy")
+    time.sleep(0.06)
+    assert queue.get() == 1
+    assert "busy" in queue.sources
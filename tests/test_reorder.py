@@ -0,0 +1,64 @@
+import time
+from unittest import mock
+
+from coral.reorder import ReorderBuffer
+
+
+def new_buffer(timeout: float = 10):
+    published, dropped = [], []
+    metrics = mock.Mock()
+    buffer = ReorderBuffer(timeout, published.append, dropped.append, metrics)
+    return buffer, published, dropped, metrics
+
+
+def test_publish_in_receive_order():
+    buffer, published, _, _ = new_buffer()
+    for raw_id in ["a", "b", "c"]:
+        buffer.register(raw_id, "cam")
+    buffer.done("c", "C")
+    buffer.done("b", "B")
+    assert published == []
+    buffer.done("a", "A")
+    assert published == ["A", "B", "C"]
+
+
+def test_sources_are_ordered_independently():
+    buffer, published, _, _ = new_buffer()
+    buffer.register("a1", "cam_a")
+    buffer.register("b1", "cam_b")
+    buffer.done("b1", "B1")
+    assert published == ["B1"]
+
+
+def test_ignored_frame_keeps_its_place():
+    buffer, published, _, _ = new_buffer()
+    for raw_id in ["a", "b"]:
+        buffer.register(raw_id, "cam")
+    buffer.done("b", "B")
+    # 被忽略的帧不发送, 但不阻塞之后的帧
+    buffer.done("a", None)
+    assert published == ["B"]
+
+
+def test_skip_gap_after_timeout_and_drop_late_frame():
+    buffer, published, dropped, metrics = new_buffer(timeout=0.05)
+    for raw_id in ["a", "b", "c"]:
+        buffer.register(raw_id, "cam")
+    buffer.done("b", "B")
+    buffer.done("c", "C")
+    buffer.flush_expired()
+    assert published == []
+    time.sleep(0.06)
+    buffer.flush_expired()
+    assert published == ["B", "C"]
+    metrics.count_gap_skip_frames.assert_called_once_with(1)
+    # 空缺被跳过后到达的迟到帧直接丢弃
+    buffer.done("a", "A")
+    assert published == ["B", "C"]
+    assert dropped == ["A"]
+
+
+def test_unregistered_frame_is_published_directly():
+    buffer, published, _, _ = new_buffer()
+    buffer.done("unknown", "X")
+    assert published == ["X"]
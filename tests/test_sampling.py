@@ -0,0 +1,47 @@
+from coral.sampling import FpsSampler
+
+
+def kept(sampler: FpsSampler, source_id: str, timestamps) -> int:
+    return sum(not sampler.is_pass(source_id, ts) for ts in timestamps)
+
+
+def test_zero_target_keeps_every_frame():
+    sampler = FpsSampler(target_fps=0)
+    assert kept(sampler, "cam", [idx / 30 for idx in range(30)]) == 30
+
+
+def test_downsample_to_target_fps():
+    sampler = FpsSampler(target_fps=10)
+    # 30帧/秒的数据源运行3秒
+    assert abs(kept(sampler, "cam", [idx / 30 for idx in range(90)]) - 30) <= 1
+
+
+def test_slower_source_is_not_sampled():
+    sampler = FpsSampler(target_fps=10)
+    assert kept(sampler, "cam", [idx / 5 for idx in range(20)]) == 20
+
+
+def test_jitter_within_tolerance_is_kept():
+    sampler = FpsSampler(target_fps=10)
+    # 帧间隔略小于目标间隔
+    assert kept(sampler, "cam", [idx * 0.099 for idx in range(20)]) == 20
+
+
+def test_per_source_target_fps():
+    sampler = FpsSampler(target_fps=10)
+    sampler.set_target_fps("slow", 5)
+    # None 表示使用全局目标帧率
+    sampler.set_target_fps("default", None)
+    assert sampler.target_fps("default") == 10
+    timestamps = [idx / 30 for idx in range(90)]
+    assert abs(kept(sampler, "slow", timestamps) - 15) <= 1
+    assert abs(kept(sampler, "default", timestamps) - 30) <= 1
+
+
+def test_timestamp_rewind_restarts_timing():
+    sampler = FpsSampler(target_fps=10)
+    assert not sampler.is_pass("cam", 100.0)
+    # 数据源重启后时间戳回退, 第一帧不丢弃
+    assert not sampler.is_pass("cam", 1.0)
+    assert sampler.is_pass("cam", 1.01)
+    assert not sampler.is_pass("cam", 1.1)
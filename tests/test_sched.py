@@ -0,0 +1,129 @@
+import os
+import time
+import atexit
+import uuid
+import subprocess
+
+import numpy as np
+import pytest
+import SharedArray as sa
+from wrapyfi.utils import SingletonOptimized
+
+from coral.constants import SHARED_DATA_TYPE, SHARED_MEMORY_ID_STORE_DIR
+from coral.sched import SharedMemoryIDManager, read_journal
+
+
+def new_memory_id() -> str:
+    return f"{SHARED_DATA_TYPE}coraltest-{uuid.uuid4().hex[:8]}"
+
+
+def dead_pid() -> int:
+    proc = subprocess.Popen(["true"])
+    proc.wait()
+    return proc.pid
+
+
+def exists(memory_id: str) -> bool:
+    return os.path.exists(os.path.join("/dev/shm", memory_id[len(SHARED_DATA_TYPE) :]))
+
+
+@pytest.fixture
+def manager_id():
+    return f"test_{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def new_manager():
+    """共享内存管理器是进程级单例, 每次创建前移除已有实例"""
+
+    managers = []
+
+    def create(manager_id: str) -> SharedMemoryIDManager:
+        SingletonOptimized._instances.pop(SharedMemoryIDManager, None)
+        managers.append(SharedMemoryIDManager(manager_id=manager_id, expire=20))
+        return managers[-1]
+
+    yield create
+    SingletonOptimized._instances.pop(SharedMemoryIDManager, None)
+    for manager in managers:
+        atexit.unregister(manager.dump)
+        atexit.unregister(manager.destroy_slots)
+
+
+@pytest.fixture
+def segments():
+    memory_ids = []
+    yield memory_ids
+    for memory_id in memory_ids:
+        if exists(memory_id):
+            sa.delete(memory_id)
+
+
+def write_journal(manager_id: str, lines) -> str:
+    fp = os.path.join(SHARED_MEMORY_ID_STORE_DIR, f"{manager_id}.journal")
+    with open(fp, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return fp
+
+
+def test_read_journal(tmp_path):
+    fp = tmp_path / "node.journal"
+    fp.write_text(
+        "pid 42\n"
+        "+ shm://a 1.5\n"
+        "+ shm://b 2.5\n"
+        "- shm://a\n"
+        "s shm://coralpool-node-1 4\n"
+        "s shm://coralframes-node-2 8\n"
+        "x shm://coralpool-node-1\n"
+        # 进程被强制结束时最后一行不完整
+        "+ shm://c"
+    )
+    memory_store, slots, owner = read_journal(str(fp))
+    assert owner == 42
+    assert memory_store == {"shm://b": 2.5}
+    assert slots == {"shm://coralframes-node-2": 8}
+
+
+def test_compact_journal(manager_id, new_manager, segments):
+    manager = new_manager(manager_id)
+    memory_ids = [new_memory_id() for _ in range(3)]
+    segments.extend(memory_ids)
+    for memory_id in memory_ids:
+        manager.add(memory_id, (2, 2), np.uint8)
+    manager.remove(memory_ids[0])
+    with open(manager._fp) as f:
+        assert len(f.read().splitlines()) == 5
+    manager.dump()
+    with open(manager._fp) as f:
+        assert len(f.read().splitlines()) == 3
+    memory_store, _, owner = read_journal(manager._fp)
+    assert owner == os.getpid()
+    assert set(memory_store) == set(memory_ids[1:])
+
+
+def test_replay_journal_of_dead_owner(manager_id, new_manager, segments):
+    memory_id = new_memory_id()
+    segments.append(memory_id)
+    sa.create(memory_id, (2, 2), np.uint8)
+    write_journal(manager_id, [f"pid {dead_pid()}", f"+ {memory_id} {time.time()}"])
+    manager = new_manager(manager_id)
+    # 上次运行的进程已退出, 其创建的共享内存被删除
+    assert not exists(memory_id)
+    assert memory_id not in manager._memory_store
+    memory_store, _, owner = read_journal(manager._fp)
+    assert owner == os.getpid()
+    assert memory_store == {}
+
+
+def test_replay_journal_of_live_owner(manager_id, new_manager, segments):
+    memory_id = new_memory_id()
+    segments.append(memory_id)
+    sa.create(memory_id, (2, 2), np.uint8)
+    write_journal(manager_id, [f"pid {os.getppid()}", f"+ {memory_id} {time.time()}"])
+    manager = new_manager(manager_id)
+    # 同一 manager_id 的进程仍在运行, 共享内存保留并按过期时间清理
+    assert exists(memory_id)
+    assert memory_id in manager._memory_store
+    memory_store, _, _ = read_journal(manager._fp)
+    assert memory_id in memory_store
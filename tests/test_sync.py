@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from coral.sync import FrameSynchronizer
+
+
+def frame(name: str, timestamp: float):
+    return SimpleNamespace(name=name, timestamp=timestamp)
+
+
+def names(group):
+    return [payload.name for payload in group]
+
+
+def new_synchronizer(maxsize: int = 10):
+    dropped = []
+    synchronizer = FrameSynchronizer(
+        ["left", "right"], tolerance=0.05, maxsize=maxsize, drop=dropped.append
+    )
+    return synchronizer, dropped
+
+
+def test_group_in_receiver_order():
+    synchronizer, dropped = new_synchronizer()
+    assert synchronizer.put("right", frame("r1", 1.00)) is None
+    group = synchronizer.put("left", frame("l1", 1.02))
+    assert names(group) == ["l1", "r1"]
+    assert dropped == []
+
+
+def test_drop_frames_that_can_not_be_aligned():
+    synchronizer, dropped = new_synchronizer()
+    synchronizer.put("left", frame("l1", 1.0))
+    synchronizer.put("left", frame("l2", 1.1))
+    # 右侧最早的帧比 l1 晚超过 tolerance, l1 无法再对齐
+    group = synchronizer.put("right", frame("r2", 1.11))
+    assert names(group) == ["l2", "r2"]
+    assert names(dropped) == ["l1"]
+
+
+def test_drop_oldest_when_buffer_is_full():
+    synchronizer, dropped = new_synchronizer(maxsize=2)
+    for idx in range(3):
+        assert synchronizer.put("left", frame(f"l{idx}", idx)) is None
+    assert names(dropped) == ["l0"]
+    group = synchronizer.put("right", frame("r2", 2))
+    assert names(group) == ["l2", "r2"]
+    assert names(dropped) == ["l0", "l1"]